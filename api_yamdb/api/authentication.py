@@ -0,0 +1,99 @@
+"""JWT-аутентификация без чтения пользователя из БД на каждый запрос.
+
+В токен кладутся role и is_superuser — всё, что нужно разрешениям.
+Пользователь собирается из этих claims как экземпляр User с отложенными
+остальными полями; username в claims нет, он читается из БД при
+обращении, и смена имени через /users/me/ не отзывает токен. Чтобы смена
+роли вступала в силу без ожидания истечения токена, claims сверяются с БД
+не чаще раза в USER_CLAIMS_CACHE_TTL секунд на пользователя и процесс;
+сигнал сбрасывает сверку при изменении пользователя. Токен с устаревшими
+claims отклоняется.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.models import User
+
+CLAIM_FIELDS = ('role', 'is_superuser')
+
+
+def get_claims(user):
+    return tuple(getattr(user, field) for field in CLAIM_FIELDS)
+
+
+def get_access_token(user):
+    """Access-токен с claims, по которым строится пользователь."""
+    refresh = RefreshToken.for_user(user)
+    for field, value in zip(CLAIM_FIELDS, get_claims(user)):
+        refresh[field] = value
+    return refresh.access_token
+
+
+class ClaimsCache:
+    """Локальный кэш: id -> claims, сверенные с БД, и срок сверки."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def check(self, user_id, claims):
+        entry = self.entries.get(user_id)
+        return (entry is not None and entry[0] == claims
+                and entry[1] > time.monotonic())
+
+    def store(self, user_id, claims):
+        expires = time.monotonic() + settings.USER_CLAIMS_CACHE_TTL
+        with self.lock:
+            self.entries[user_id] = (claims, expires)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+claims_cache = ClaimsCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, берущая пользователя из claims токена."""
+
+    def get_user(self, validated_token):
+        if any(field not in validated_token for field in CLAIM_FIELDS):
+            # Токены, выданные до появления claims.
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user '
+                               'identification')
+        claims = tuple(validated_token[field] for field in CLAIM_FIELDS)
+        if not claims_cache.check(user_id, claims):
+            current = User.objects.filter(
+                pk=user_id, is_active=True
+            ).values_list(*CLAIM_FIELDS).first()
+            if current is None:
+                raise AuthenticationFailed('User not found',
+                                           code='user_not_found')
+            if current != claims:
+                raise AuthenticationFailed('Token claims are outdated',
+                                           code='token_outdated')
+            claims_cache.store(user_id, claims)
+        values = dict(zip(CLAIM_FIELDS, claims), id=user_id, is_active=True)
+        # from_db ждёт значения в порядке полей модели.
+        field_names = [field.attname for field in User._meta.concrete_fields
+                       if field.attname in values]
+        return User.from_db(
+            DEFAULT_DB_ALIAS, field_names,
+            [values[name] for name in field_names],
+        )
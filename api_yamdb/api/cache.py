@@ -0,0 +1,95 @@
+"""Кэш ответов для редко меняющихся read-only эндпоинтов каталога.
+
+Ключи версионируются по пространству имён: при изменении данных версия
+увеличивается, и все старые ключи перестают читаться. Это работает на любом
+бэкенде Django (locmem, Redis) без удаления ключей по шаблону.
+
+Попадания и промахи считаются в памяти процесса, без запросов к кэшу;
+между воркерами их складывают снимки api.metrics (API_METRICS_DIR).
+"""
+import hashlib
+import threading
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _incr(key):
+    cache = get_cache()
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ вытеснили между add() и incr().
+        cache.set(key, 1, None)
+        return 1
+
+
+def _version_key(namespace):
+    return f'api-cache:{namespace}:version'
+
+
+def make_key(namespace, request):
+    """Ключ по пути и отсортированной строке запроса (фильтры, limit...).
+
+    Host в ключ не входит: ответы API не зависят от имени сервера, и
+    запросы по IP, домену и из nginx делят одну запись.
+    """
+    version = get_cache().get(_version_key(namespace), 0)
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f'{request.path}?{query}#{request.accepted_renderer.format}'
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'api-cache:{namespace}:{version}:{digest}'
+
+
+def load(key):
+    data = get_cache().get(key)
+    with _counts_lock:
+        _counts['misses' if data is None else 'hits'] += 1
+    return data
+
+
+def store(key, data):
+    get_cache().set(key, data, settings.API_CACHE_TIMEOUT)
+
+
+def invalidate(namespace):
+    """Сбрасывает кэш сразу и ещё раз после коммита транзакции.
+
+    Повторный сброс не даёт параллельному запросу закэшировать данные,
+    прочитанные до коммита.
+    """
+    _incr(_version_key(namespace))
+    transaction.on_commit(lambda: _incr(_version_key(namespace)))
+
+
+def counters():
+    """Попадания и промахи этого процесса."""
+    with _counts_lock:
+        return {'hits': _counts['hits'], 'misses': _counts['misses']}
+
+
+def reset_counters():
+    with _counts_lock:
+        _counts.clear()
+
+
+def stats(counts=None):
+    """Доля попаданий по counts (по умолчанию — счётчики процесса)."""
+    counts = counters() if counts is None else counts
+    total = counts['hits'] + counts['misses']
+    return {
+        'hits': counts['hits'],
+        'misses': counts['misses'],
+        'hit_ratio': counts['hits'] / total if total else 0.0,
+    }
@@ -1,12 +1,59 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django_filters.rest_framework import CharFilter, ChoiceFilter, FilterSet
+from rest_framework.exceptions import ValidationError
 from reviews.models import Title
+from reviews.search import SearchError, search_titles
+
+# exact идёт по уникальному индексу slug, prefix — по LIKE 'x%'
+# (varchar_pattern_ops), trigram — по GIN-индексу pg_trgm.
+SLUG_LOOKUPS = {
+    'exact': 'exact',
+    'prefix': 'startswith',
+    'trigram': 'trigram_similar',
+}
 
 
 class TitleFilter(FilterSet):
-    category = CharFilter(field_name='category__slug', lookup_expr='contains')
-    genre = CharFilter(field_name='genre__slug', lookup_expr='contains')
+    slug_match = ChoiceFilter(
+        choices=[(mode, mode) for mode in SLUG_LOOKUPS],
+        method='filter_slug_match',
+    )
+    category = CharFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
     name = CharFilter(field_name='name', lookup_expr='contains')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ['category', 'genre', 'name', 'year']
+
+    def slug_lookup(self, field_name):
+        mode = self.form.cleaned_data.get('slug_match') or 'exact'
+        lookup = SLUG_LOOKUPS[mode]
+        if mode == 'trigram' and connection.vendor != 'postgresql':
+            lookup = 'icontains'
+        return f'{field_name}__{lookup}'
+
+    def filter_slug_match(self, queryset, name, value):
+        # Режим сравнения slug читают фильтры category и genre.
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(**{self.slug_lookup('category__slug'): value})
+
+    def filter_genre(self, queryset, name, value):
+        # Полусоединение: произведение не дублируется при нескольких
+        # подходящих жанрах.
+        genres = Title.genre.through.objects.filter(
+            title=OuterRef('pk'), **{self.slug_lookup('genre__slug'): value}
+        )
+        return queryset.annotate(
+            in_genre=Exists(genres)
+        ).filter(in_genre=True)
+
+    def filter_search(self, queryset, name, value):
+        try:
+            return search_titles(queryset, value)
+        except SearchError as error:
+            raise ValidationError({'search': [str(error)]}) from error
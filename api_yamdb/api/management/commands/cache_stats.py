@@ -0,0 +1,24 @@
+from api import cache, metrics
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Статистика попаданий в кэш ответов каталога по снимкам воркеров."""
+
+    help = 'Show API response cache hits, misses and hit ratio.'
+
+    def handle(self, *args, **options):
+        if not settings.API_METRICS_DIR:
+            # Счётчики в памяти воркеров, у команды — свои нули.
+            raise CommandError(
+                'Cache counters live inside each worker; set API_METRICS_DIR '
+                'to aggregate them or read /api/v1/_metrics.'
+            )
+        *_, counts = metrics.read_snapshots(settings.API_METRICS_DIR)
+        stats = cache.stats(counts)
+        self.stdout.write(
+            'hits={hits} misses={misses} hit_ratio={hit_ratio:.3f}'.format(
+                **stats
+            )
+        )
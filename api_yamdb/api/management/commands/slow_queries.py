@@ -0,0 +1,58 @@
+import os
+
+from api import slow_queries
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    """Топ форм медленных SQL-запросов из журнала api.slow_queries."""
+
+    help = 'Show the slowest normalized SQL shapes from the slow query log.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--order', choices=('total_ms', 'max_ms', 'count'),
+            default='total_ms',
+        )
+        parser.add_argument('--log', default=None,
+                            help='Log file, API_SLOW_QUERY_LOG by default.')
+        parser.add_argument('--no-plan', action='store_true')
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Re-run the slowest query of each shape with EXPLAIN '
+                 '(ANALYZE, BUFFERS); PostgreSQL only.',
+        )
+        parser.add_argument('--clear', action='store_true',
+                            help='Truncate the log after printing.')
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.API_SLOW_QUERY_LOG
+        if not os.path.exists(path):
+            raise CommandError(f'Slow query log {path} does not exist.')
+        if options['analyze'] and connection.vendor != 'postgresql':
+            raise CommandError('--analyze needs PostgreSQL.')
+        shapes = slow_queries.top_shapes(
+            slow_queries.read(path), options['top'], options['order']
+        )
+        for shape in shapes:
+            views = ','.join(sorted(shape['views'])) or '-'
+            fields = ','.join(sorted(shape['fields'])) or '-'
+            self.stdout.write(
+                f'count={shape["count"]} total_ms={shape["total_ms"]:.1f} '
+                f'max_ms={shape["max_ms"]:.1f} views={views} fields={fields}'
+            )
+            self.stdout.write(f'  {shape["shape"]}')
+            plan = shape['plan']
+            if options['analyze'] and shape['sql']:
+                # Вне запроса API: SELECT выполняется ещё раз и откатывается.
+                plan = slow_queries.explain(
+                    connection, shape['sql'], shape['params'], analyze=True
+                )
+            if plan and not options['no_plan']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+        if options['clear']:
+            open(path, 'w').close()
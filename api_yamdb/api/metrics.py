@@ -0,0 +1,306 @@
+"""Метрики запросов: полное время, время и число SQL, сериализация.
+
+RequestMetricsMiddleware заводит запись на запрос и считает SQL через
+connection.execute_wrapper — без DEBUG и без хранения текстов запросов.
+Время сериализации отмечают блоки with serializing() (страницы списков
+и объекты retrieve); SQL, выполненный внутри блока, в него не входит.
+Запросы дольше API_SLOW_QUERY_MS уходят в журнал api.slow_queries.
+
+Готовые записи попадают в кольцевой буфер последних
+API_METRICS_BUFFER_SIZE запросов (из него считаются квантили) и в
+накопительные счётчики по маршрутам. /api/v1/_metrics отдаёт их вместе
+со счётчиками кэша ответов (api.cache) в текстовом формате Prometheus.
+
+Записи хранятся в памяти процесса. Без API_METRICS_DIR каждый воркер
+gunicorn отдаёт только свои метрики, и за балансировщиком nginx счётчики
+скачут между воркерами. С API_METRICS_DIR воркер не реже раза в
+API_METRICS_FLUSH_INTERVAL секунд пишет снимок в <каталог>/<pid>.json, а
+/api/v1/_metrics складывает счётчики всех файлов, в том числе завершённых
+воркеров, чтобы они не убывали. Квантили считаются по окнам живых
+воркеров.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+
+from . import cache, slow_queries
+
+QUANTILES = (0.5, 0.9, 0.99)
+UNMATCHED_ROUTE = 'unmatched'
+# Поле записи: (имя метрики, описание).
+SUMMARIES = {
+    'total': ('yamdb_http_request_duration_seconds',
+              'Request wall time in seconds.'),
+    'db': ('yamdb_http_request_db_seconds',
+           'Time spent in SQL queries per request, in seconds.'),
+    'queries': ('yamdb_http_request_queries',
+                'SQL queries per request.'),
+    'serialize': ('yamdb_http_request_serialize_seconds',
+                  'Serializer time per request without SQL, in seconds.'),
+}
+
+# Запись из снимка другого воркера: только то, что нужно квантилям.
+Sample = namedtuple('Sample', ('route', 'method') + tuple(SUMMARIES))
+
+_local = threading.local()
+
+
+class RequestRecord:
+    """Метрики одного запроса; сам объект — execute_wrapper для SQL."""
+
+    __slots__ = ('request', 'route', 'method', 'status', 'started',
+                 'total', 'db', 'queries', 'serialize', 'slow_after',
+                 'explaining')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.slow_after = settings.API_SLOW_QUERY_MS / 1000
+        self.explaining = False
+        self.route = UNMATCHED_ROUTE
+        self.method = ''
+        self.status = 0
+        self.started = time.perf_counter()
+        self.total = self.db = self.serialize = 0.0
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            # EXPLAIN журнала медленных запросов не входит в метрики.
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db += duration
+            self.queries += 1
+        if self.slow_after and duration >= self.slow_after:
+            self.explaining = True
+            try:
+                slow_queries.capture(self, sql, params, many,
+                                     context['connection'], duration)
+            finally:
+                self.explaining = False
+        return result
+
+    def finish(self, request, response):
+        self.total = time.perf_counter() - self.started
+        # Записи живут в буфере, запрос с ними хранить незачем.
+        self.request = None
+        self.method = request.method
+        self.status = response.status_code
+        match = request.resolver_match
+        if match is not None:
+            self.route = match.view_name
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries", '
+            f'serialize;dur={self.serialize * 1000:.1f}, '
+            f'total;dur={self.total * 1000:.1f}'
+        )
+
+
+def start(request=None):
+    _local.record = RequestRecord(request)
+    return _local.record
+
+
+def stop():
+    _local.record = None
+
+
+@contextmanager
+def serializing():
+    """Добавляет время блока без SQL к serialize текущего запроса."""
+    record = getattr(_local, 'record', None)
+    if record is None:
+        yield
+        return
+    started, db = time.perf_counter(), record.db
+    try:
+        yield
+    finally:
+        record.serialize += time.perf_counter() - started - (record.db - db)
+
+
+def empty_sums():
+    return dict.fromkeys(('count',) + tuple(SUMMARIES), 0)
+
+
+class MetricsStore:
+    """Последние записи и накопительные суммы по (маршрут, метод).
+
+    С directory снимок пишется в файл процесса таймером после записи,
+    так что простаивающий воркер тоже успевает отдать последние запросы.
+    """
+
+    def __init__(self, size, directory=None):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=size)
+        self.requests = {}
+        self.sums = {}
+        self.directory = directory
+        self.flush_timer = None
+
+    def add(self, record):
+        key = (record.route, record.method)
+        with self.lock:
+            self.recent.append(record)
+            status_key = key + (record.status,)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            sums = self.sums.setdefault(key, empty_sums())
+            sums['count'] += 1
+            for field in SUMMARIES:
+                sums[field] += getattr(record, field)
+            if self.directory and self.flush_timer is None:
+                self.flush_timer = threading.Timer(
+                    settings.API_METRICS_FLUSH_INTERVAL, self.flush
+                )
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def snapshot(self):
+        with self.lock:
+            return (list(self.recent), dict(self.requests),
+                    {key: dict(sums) for key, sums in self.sums.items()})
+
+    def flush(self):
+        """Атомарно заменяет файл снимка процесса в directory."""
+        with self.lock:
+            self.flush_timer = None
+        recent, requests, sums = self.snapshot()
+        data = {
+            'cache': cache.counters(),
+            'requests': [key + (count,) for key, count in requests.items()],
+            'sums': [key + (values,) for key, values in sums.items()],
+            'recent': [
+                [record.route, record.method]
+                + [getattr(record, field) for field in SUMMARIES]
+                for record in recent
+            ],
+        }
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(data, file)
+        os.replace(f'{path}.tmp', path)
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        pass
+    return True
+
+
+def collect(store):
+    """Окно, запросы, суммы и счётчики кэша процесса или всех воркеров."""
+    if not store.directory:
+        return (*store.snapshot(), cache.counters())
+    store.flush()
+    return read_snapshots(store.directory)
+
+
+def read_snapshots(directory):
+    """Складывает снимки воркеров в directory (см. collect)."""
+    recent, requests, sums = [], Counter(), {}
+    cache_counts = Counter(hits=0, misses=0)
+    for name in os.listdir(directory):
+        pid, extension = os.path.splitext(name)
+        if extension != '.json':
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for route, method, status, count in data['requests']:
+            requests[(route, method, status)] += count
+        for route, method, values in data['sums']:
+            target = sums.setdefault((route, method), empty_sums())
+            for field, value in values.items():
+                target[field] += value
+        cache_counts.update(data.get('cache', {}))
+        if process_alive(int(pid)):
+            recent += [Sample(*row) for row in data['recent']]
+    return recent, requests, sums, cache_counts
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    return MetricsStore(settings.API_METRICS_BUFFER_SIZE,
+                        settings.API_METRICS_DIR)
+
+
+def reset_store():
+    get_store.cache_clear()
+
+
+def label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def labels(route, method, **extra):
+    pairs = dict(route=route, method=method, **extra)
+    return ','.join(f'{key}="{label(value)}"' for key, value in pairs.items())
+
+
+def quantile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def render_prometheus():
+    """Метрики воркеров и кэша ответов в текстовом формате Prometheus."""
+    store = get_store()
+    recent, requests, sums, cache_counts = collect(store)
+    scope, quantile_scope = (('all workers', 'each live worker')
+                             if store.directory
+                             else ('this process',) * 2)
+    lines = [
+        f'# HELP yamdb_http_requests_total Requests handled by {scope}.',
+        '# TYPE yamdb_http_requests_total counter',
+    ]
+    for (route, method, status), count in sorted(requests.items()):
+        lines.append('yamdb_http_requests_total{%s} %d' % (
+            labels(route, method, status=status), count
+        ))
+    window = {}
+    for record in recent:
+        window.setdefault((record.route, record.method), []).append(record)
+    for field, (name, description) in SUMMARIES.items():
+        lines.append(f'# HELP {name} {description} Quantiles over the '
+                     f'last {settings.API_METRICS_BUFFER_SIZE} requests '
+                     f'of {quantile_scope}.')
+        lines.append(f'# TYPE {name} summary')
+        for key in sorted(sums):
+            values = sorted(getattr(record, field)
+                            for record in window.get(key, ()))
+            for share in QUANTILES if values else ():
+                lines.append('%s{%s} %s' % (
+                    name, labels(*key, quantile=share),
+                    quantile(values, share),
+                ))
+            lines.append('%s_sum{%s} %s' % (
+                name, labels(*key), sums[key][field]
+            ))
+            lines.append('%s_count{%s} %d' % (
+                name, labels(*key), sums[key]['count']
+            ))
+    for field in ('hits', 'misses'):
+        name = f'yamdb_api_cache_{field}_total'
+        lines.append(f'# HELP {name} Response cache {field}, {scope}.')
+        lines.append(f'# TYPE {name} counter')
+        lines.append(f'{name} {cache_counts[field]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,50 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+from .throttling import RATE_LIMIT_ATTR
+
+
+class RateLimitHeadersMiddleware:
+    """Добавляет к ответу X-RateLimit-* от TokenBucketThrottle."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        for header, value in getattr(request, RATE_LIMIT_ATTR, {}).items():
+            response[header] = value
+        return response
+
+
+class RequestMetricsMiddleware:
+    """Server-Timing и запись в api.metrics для каждого запроса.
+
+    Стоит первым в MIDDLEWARE, чтобы время включало остальные middleware.
+    При API_METRICS_ENABLED=False Django исключает его из цепочки.
+    Тело потокового ответа читается уже после middleware, и его SQL не
+    учитывается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        record = metrics.start(request)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record))
+                response = self.get_response(request)
+        finally:
+            metrics.stop()
+        record.finish(request, response)
+        response['Server-Timing'] = record.server_timing()
+        metrics.get_store().add(record)
+        return response
@@ -1,4 +1,30 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import mixins, status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from reviews.versions import get_version
+
+from . import cache, metrics
+from .permissions import IsAdminOrSuperuser
+from .streaming import stream_json
+
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def conditional_response(request, response):
+    """304 (или 412), если валидаторы ответа совпали с заголовками запроса."""
+    last_modified = response.get('Last-Modified')
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+        response=response,
+    )
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -6,3 +32,176 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class CachedResponseMixin:
+    """Отдаёт list/retrieve из кэша ответов (см. api.cache)."""
+
+    cache_namespace = 'catalog'
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.API_CACHE_TIMEOUT:
+            return handler(request, *args, **kwargs)
+        key = cache.make_key(self.cache_namespace, request)
+        cached = cache.load(key)
+        if cached is not None:
+            data, headers = cached
+            response = Response(data, headers=headers)
+            response['X-Cache'] = 'HIT'
+            return conditional_response(request, response)
+        response = handler(request, *args, **kwargs)
+        if (isinstance(response, Response)
+                and response.status_code == status.HTTP_200_OK):
+            headers = {
+                header: response[header]
+                for header in VALIDATOR_HEADERS if header in response
+            }
+            cache.store(key, (response.data, headers))
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class StreamingListMixin:
+    """Весь список потоковым JSON-массивом по ?stream=true.
+
+    Без пагинации и кэша ответов (см. api.streaming). Ставится перед
+    ConditionalGetMixin: подменяет только тело ответа, ETag и 304 остаются.
+    Выгрузка обходит потолок limit, поэтому доступна только тем, кто
+    проходит stream_permission_classes (по умолчанию — администраторам);
+    права проверяются до ETag, чтобы 304 не подтверждал чужую выгрузку.
+    """
+
+    stream_query_param = 'stream'
+    stream_permission_classes = (IsAuthenticated, IsAdminOrSuperuser)
+
+    def is_streaming(self, request):
+        return (request.query_params.get(self.stream_query_param)
+                in ('1', 'true')
+                and request.accepted_renderer.format == 'json')
+
+    def list(self, request, *args, **kwargs):
+        if self.is_streaming(request):
+            for permission in self.stream_permission_classes:
+                if not permission().has_permission(request, self):
+                    self.permission_denied(
+                        request, message='Выгрузка списка целиком доступна '
+                                         'только администратору.'
+                    )
+        return super().list(request, *args, **kwargs)
+
+    def list_response(self, queryset):
+        if not self.is_streaming(self.request):
+            return super().list_response(queryset)
+        read_serializer = getattr(self, 'read_serializer_class', None)
+        if read_serializer is not None:
+            queryset = read_serializer.get_queryset(queryset)
+        response = StreamingHttpResponse(
+            stream_json(
+                queryset,
+                read_serializer or (
+                    lambda objects: self.get_serializer(objects, many=True)
+                ),
+                settings.API_STREAM_CHUNK_SIZE,
+            ),
+            content_type='application/json',
+        )
+        response['X-Cache'] = 'BYPASS'
+        return response
+
+
+class ReadSerializerMixin:
+    """Списки через read_serializer_class (values() и словари).
+
+    Ставится перед ConditionalGetMixin: заменяет только сериализацию
+    страницы, запись и retrieve идут через обычный сериализатор.
+    """
+
+    read_serializer_class = None
+
+    def list_response(self, queryset):
+        if self.read_serializer_class is None:
+            return super().list_response(queryset)
+        queryset = self.read_serializer_class.get_queryset(queryset)
+        page = self.paginate_queryset(queryset)
+        with metrics.serializing():
+            data = self.read_serializer_class(
+                queryset if page is None else page
+            ).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified для list/retrieve и ответ 304 до сериализации.
+
+    Версия списка по умолчанию — версия таблицы модели (reviews.versions):
+    один запрос по первичному ключу, без COUNT по выборке. Ленты с
+    родителем переопределяют get_list_version версией родителя. Last-Modified
+    отдаётся только для объекта, так как удаление из списка его не сдвигает.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.validated_response(
+            request, self.get_etag(request, *self.get_list_version(queryset)),
+            None, lambda: self.list_response(queryset)
+        )
+
+    def get_list_version(self, queryset):
+        """Значения, от которых зависит ETag списка."""
+        return (get_version(queryset.model),)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.validated_response(
+            request,
+            self.get_etag(request, instance.updated_at.isoformat(),
+                          instance.pk),
+            instance.updated_at,
+            lambda: self.retrieve_response(instance)
+        )
+
+    def retrieve_response(self, instance):
+        with metrics.serializing():
+            return Response(self.get_serializer(instance).data)
+
+    def list_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        with metrics.serializing():
+            data = self.get_serializer(
+                queryset if page is None else page, many=True
+            ).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_etag(self, request, *versions):
+        version = ':'.join((
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            *map(str, versions),
+        ))
+        return '"{}"'.format(hashlib.md5(version.encode()).hexdigest())
+
+    def validated_response(self, request, etag, last_modified, render):
+        validators = HttpResponse()
+        validators['ETag'] = etag
+        if last_modified:
+            validators['Last-Modified'] = http_date(last_modified.timestamp())
+        response = conditional_response(request, validators)
+        if response is not validators:
+            return response
+        response = render()
+        for header in VALIDATOR_HEADERS:
+            if header in validators:
+                response[header] = validators[header]
+        return response
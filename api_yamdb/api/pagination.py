@@ -0,0 +1,272 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.conf import settings
+from django.db import connections
+from django.template import loader
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+NONE = 'none'
+
+
+def estimate_count(queryset):
+    """Оценка числа строк планировщиком PostgreSQL (EXPLAIN, без чтения)."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ProjectPagination(LimitOffsetPagination):
+    """limit/offset с потолком max_limit и выбором подсчёта count.
+
+    ?count=exact — COUNT(*) по всей выборке;
+    ?count=estimate — точно до API_COUNT_EXACT_LIMIT строк, дальше оценка
+    планировщика (на PostgreSQL) и флаг count_estimated;
+    ?count=none — без count; next определяется по лишней строке страницы.
+    """
+
+    max_limit = 100
+    count_query_param = 'count'
+    count_mode = EXACT
+    count_modes = (EXACT, ESTIMATE, NONE)
+    count_estimated = False
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        return mode if mode in self.count_modes else self.count_mode
+
+    def get_count(self, queryset):
+        if self.counting == NONE:
+            return None
+        if (self.counting == EXACT
+                or connections[queryset.db].vendor != 'postgresql'):
+            return super().get_count(queryset)
+        limit = settings.API_COUNT_EXACT_LIMIT
+        count = queryset[:limit + 1].count()
+        if count <= limit:
+            return count
+        self.count_estimated = True
+        return max(estimate_count(queryset), count)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.counting = self.get_count_mode(request)
+        self.count = self.get_count(queryset)
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        if self.has_next or self.offset:
+            self.display_page_controls = self.template is not None
+        return page[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        if self.count_estimated:
+            response['count_estimated'] = True
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+    def get_html_context(self):
+        if self.count is None:
+            return {
+                'previous_url': self.get_previous_link(),
+                'next_url': self.get_next_link(),
+                'page_links': [],
+            }
+        return super().get_html_context()
+
+
+class TitlePagination(ProjectPagination):
+    """Строки произведений тяжелее (жанры, категория, рейтинг)."""
+
+    default_limit = 20
+    count_mode = ESTIMATE
+
+
+def keyset(queryset, position, operator):
+    """Строки выборки по одну сторону от position = (pub_date, id).
+
+    Django 2.2 не сравнивает пары полей, поэтому условие — extra():
+    (pub_date, id) < (%s, %s) идёт условием индекса (title|review,
+    pub_date, id), без OFFSET и без фильтра поверх пропущенных строк.
+    """
+    ops = connections[queryset.db].ops
+    table = ops.quote_name(queryset.model._meta.db_table)
+    pub_date, pk = position
+    return queryset.extra(
+        where=[f'({table}.{ops.quote_name("pub_date")}, '
+               f'{table}.{ops.quote_name("id")}) {operator} (%s, %s)'],
+        params=[ops.adapt_datetimefield_value(pub_date), pk],
+    )
+
+
+class FeedCursorPagination(BasePagination):
+    """Keyset-пагинация лент отзывов и комментариев по (pub_date, id).
+
+    Курсор хранит pub_date и id крайней строки страницы и направление.
+    Следующая страница — строки строго меньше этой пары, предыдущая —
+    строго больше; новые строки с той же pub_date страницы не сдвигают.
+    Строки страницы — модели или словари values() (ReadSerializer).
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = ProjectPagination.max_limit
+    invalid_cursor_message = 'Invalid cursor'
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, self.reverse = self.decode_cursor(request)
+        ordering = ('pub_date', 'id') if self.reverse else ('-pub_date', '-id')
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = keyset(queryset, position,
+                              '>' if self.reverse else '<')
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None and bool(self.page)
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        """((pub_date, id) или None, обратное направление)."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            query = parse.parse_qs(
+                b64decode(encoded.encode('ascii')).decode('ascii'),
+                keep_blank_values=True,
+            )
+            pub_date = parse_datetime(query['p'][0])
+            position = (pub_date, int(query['i'][0]))
+            reverse = bool(int(query.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, item, reverse):
+        if isinstance(item, dict):
+            pub_date, pk = item['pub_date'], item['id']
+        else:
+            pub_date, pk = item.pub_date, item.pk
+        query = {'p': pub_date.isoformat(), 'i': pk}
+        if reverse:
+            query['r'] = 1
+        encoded = b64encode(parse.urlencode(query).encode('ascii'))
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param,
+            encoded.decode('ascii'),
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Над пустой предыдущей страницей — начало ленты.
+            return remove_query_param(self.request.build_absolute_uri(),
+                                      self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        )))
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+    def to_html(self):
+        return loader.get_template(self.template).render(
+            self.get_html_context()
+        )
+
+
+class FeedPagination(ProjectPagination):
+    """Лимит/офсет по умолчанию, курсор — по параметру ?pagination=cursor.
+
+    Курсор не деградирует на глубоких страницах: вместо OFFSET он
+    продолжает выборку по индексу с последней отданной пары (pub_date, id).
+    """
+
+    default_limit = 20
+    count_mode = ESTIMATE
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_class = FeedCursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.mode_query_param) == self.cursor_mode:
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
@@ -0,0 +1,71 @@
+"""JSON-рендерер на orjson с откатом на стандартный json.
+
+Вывод совпадает с rest_framework.renderers.JSONRenderer байт в байт:
+компактные разделители, UTF-8 без экранирования, \\u2028/\\u2029
+экранированы, datetime/date/time, Decimal, ленивые строки и прочие
+не-JSON типы преобразует тот же encoders.JSONEncoder.default.
+Исключение — запись float в экспоненте (1e16 вместо 1e+16, то же число).
+Если orjson не установлен, не справился (int больше 64 бит, ключи не
+строки) или запрошен отступ, работает обычный JSONRenderer.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+_default = encoders.JSONEncoder().default
+
+
+def dumps(data):
+    """bytes как у JSONRenderer без отступа или None, если orjson не смог."""
+    if orjson is None:
+        return None
+    try:
+        ret = orjson.dumps(
+            data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    except orjson.JSONEncodeError:
+        return None
+    for separator, escaped in LINE_SEPARATORS:
+        if separator in ret:
+            ret = ret.replace(separator, escaped)
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, кодирующий через orjson, если он установлен."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        ret = dumps(data)
+        if ret is None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return ret
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Готовый текст метрик; ошибки (401, 403) — строкой комментария."""
+
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = '# {}\n'.format(data.get('detail', data))
+        return data.encode(self.charset)
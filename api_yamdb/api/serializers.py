@@ -1,8 +1,14 @@
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
+from reviews.confirmation import check_code
 from reviews.models import Category, Comment, Genre, Review, Title, User
-from reviews.utils import ROLES, USER
+from reviews.utils import ROLES, SCORE_FIELDS, SCORES, USER, histogram_rating
 from reviews.validators import username_not_me
 
 
@@ -27,26 +33,23 @@ class AdminRegistrationSerializer(serializers.ModelSerializer):
                   'last_name', 'role', 'bio')
 
 
-class TokenObtainSerializer(serializers.ModelSerializer):
+class TokenObtainSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
     username = serializers.CharField(required=True)
 
-    class Meta:
-        model = User
-        fields = ['username', 'confirmation_code']
-
-    def validate_confirmation_code(self, code):
-        try:
-            user = get_object_or_404(User,
-                                     username=self.initial_data['username'])
-            if str(code) == str(user.confirmation_code):
-                return code
-            else:
-                raise ValidationError(
-                    'Incorrect confirmation code. Try again.'
-                )
-        except KeyError:
-            return ('KeyError')
+    def validate(self, data):
+        user = get_object_or_404(
+            User.objects.only(
+                'id', 'confirmation_nonce', 'username', 'role', 'is_superuser'
+            ),
+            username=data['username'],
+        )
+        if not check_code(user, data['confirmation_code']):
+            raise ValidationError({'confirmation_code': [
+                'Incorrect confirmation code. Try again.'
+            ]})
+        data['user'] = user
+        return data
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -57,6 +60,12 @@ class UserSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(required=False)
     username = serializers.CharField(required=False)
 
+    unique_fields = ('email', 'username')
+    unique_messages = {
+        'email': 'A user with this email already exists.',
+        'username': 'A user with this username already exists.',
+    }
+
     class Meta:
         model = User
         fields = ('email', 'username', 'first_name',
@@ -70,15 +79,48 @@ class UserSerializer(serializers.ModelSerializer):
             return role
         return USER
 
-    def validate_email(self, email):
-        if (self.instance.email != email
-                and User.objects.filter(email=email).count() > 0):
-            raise ValidationError('A user with this email already exists.')
-
     def validate_username(self, username):
-        if (self.instance.username != username
-                and User.objects.filter(username=username).count() > 0):
-            raise ValidationError('A user with this username already exists.')
+        return username_not_me(username)
+
+    def validate(self, data):
+        self.check_unique(data, self.get_unique_values(self.instance))
+        return data
+
+    def get_unique_values(self, instance):
+        return {field: getattr(instance, field, None)
+                for field in self.unique_fields}
+
+    def check_unique(self, data, current):
+        """Все уникальные поля, которые меняются, — одним запросом."""
+        changed = {
+            field: data[field] for field in self.unique_fields
+            if field in data and data[field] != current[field]
+        }
+        if not changed:
+            return
+        taken = User.objects.filter(
+            reduce(or_, (Q(**{field: value})
+                         for field, value in changed.items()))
+        ).exclude(
+            pk=getattr(self.instance, 'pk', None)
+        ).values_list(*changed)
+        errors = {}
+        for row in taken:
+            for (field, value), existing in zip(changed.items(), row):
+                if existing == value:
+                    errors[field] = [self.unique_messages[field]]
+        if errors:
+            raise ValidationError(errors)
+
+    def update(self, instance, validated_data):
+        current = self.get_unique_values(instance)
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            # Значение заняли между проверкой и записью.
+            self.check_unique(validated_data, current)
+            raise
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -102,40 +144,40 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
 
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
+    def create(self, validated_data):
+        # Один отзыв на произведение гарантирует ограничение unique_review.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             if Review.objects.filter(
-                    title=title,
-                    author=request.user
+                title=validated_data['title'],
+                author=validated_data['author'],
             ).exists():
                 raise ValidationError(
-                    'Можно добавить только'
-                    'один отзыв на произведение'
+                    'Можно добавить только один отзыв на произведение'
                 )
-        return data
+            raise
 
 
 class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
-        exclude = ['id']
+        fields = ('name', 'slug')
         model = Genre
 
 
 class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
-        exclude = ['id']
+        fields = ('name', 'slug')
         model = Category
 
 
 class TitleSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         fields = (
@@ -150,6 +192,19 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(source='rating_count')
+    mean = serializers.FloatField(source='rating_mean')
+    median = serializers.FloatField(source='rating_median')
+    histogram = serializers.DictField(
+        source='score_histogram', child=serializers.IntegerField()
+    )
+
+    class Meta:
+        fields = ('id', 'count', 'mean', 'median', 'histogram')
+        model = Title
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         slug_field='slug',
@@ -162,5 +217,106 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
+
+
+class ReadSerializer:
+    """Быстрая сериализация списков без объектов полей DRF.
+
+    get_queryset() сужает выборку до values() нужных колонок (автор —
+    через JOIN). Наследник задаёт values и метод to_representation(row),
+    который собирает из строки values() словарь ответа; вывод должен
+    совпадать с полным сериализатором того же эндпоинта.
+    """
+
+    values = ()
+    # Одно поле на все строки: формат даты как у DateTimeField DRF.
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_queryset(cls, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(
+            *cls.values
+        )
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+
+class ReviewReadSerializer(ReadSerializer):
+    """Поля ReviewSerializer для списка отзывов."""
+
+    values = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': self.datetime_field.to_representation(
+                row['pub_date']
+            ),
+        }
+
+
+class CommentReadSerializer(ReadSerializer):
+    """Поля CommentSerializer для списка комментариев."""
+
+    values = ('id', 'text', 'author__username', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': self.datetime_field.to_representation(
+                row['pub_date']
+            ),
+        }
+
+
+class TitleReadSerializer(ReadSerializer):
+    """Поля TitleSerializer; жанры страницы — одним запросом.
+
+    Жанры упорядочены по id, как в Prefetch у TitleViewSet.
+    """
+
+    values = ('id', 'name', 'year', 'description', 'category__name',
+              'category__slug', *SCORE_FIELDS)
+
+    @property
+    def data(self):
+        self.genres = {}
+        genres = Title.genre.through.objects.filter(
+            title_id__in=[row['id'] for row in self.rows]
+        ).order_by('genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        )
+        for title_id, name, slug in genres:
+            self.genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+        return super().data
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': histogram_rating({
+                score: row[field]
+                for score, field in zip(SCORES, SCORE_FIELDS)
+            }),
+            'description': row['description'],
+            'genre': self.genres.get(row['id'], []),
+            'category': None if row['category__slug'] is None else {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            },
+        }
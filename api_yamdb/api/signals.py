@@ -0,0 +1,63 @@
+import time
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.signals import bulk_changed
+
+from . import cache
+from .authentication import claims_cache
+
+
+def invalidate_catalog(sender, **kwargs):
+    cache.invalidate('catalog')
+
+
+for model in (Category, Genre, Title, Review):
+    post_save.connect(invalidate_catalog, sender=model)
+    post_delete.connect(invalidate_catalog, sender=model)
+m2m_changed.connect(invalidate_catalog, sender=Title.genre.through)
+bulk_changed.connect(invalidate_catalog)
+
+
+def forget_user_claims(sender, instance, **kwargs):
+    """Роль могла измениться — следующий запрос сверит claims."""
+    claims_cache.discard(instance.pk)
+
+
+post_save.connect(forget_user_claims, sender=User)
+post_delete.connect(forget_user_claims, sender=User)
+
+
+def check_connections(**kwargs):
+    """Закрывает переиспользуемые соединения, которые оборвала БД.
+
+    Выполняется после close_old_connections: устаревшие по CONN_MAX_AGE
+    соединения уже закрыты, а соединения после ошибки БД Django сам
+    проверяет is_usable(). Остальные проверяются не на каждом запросе, а
+    не чаще раза в CONN_HEALTH_CHECK_INTERVAL секунд: SELECT 1 на каждый
+    запрос стоил бы лишнего обращения к БД. Только что открытое
+    соединение не проверяется — отсчёт начинается с него.
+    """
+    now = time.monotonic()
+    for connection in connections.all():
+        settings_dict = connection.settings_dict
+        if (connection.connection is None
+                or connection.in_atomic_block
+                or not settings_dict.get('CONN_HEALTH_CHECKS')):
+            continue
+        raw, checked_at = getattr(connection, 'health_checked', (None, 0))
+        if raw is not connection.connection:
+            connection.health_checked = (connection.connection, now)
+            continue
+        if now - checked_at < settings_dict.get(
+                'CONN_HEALTH_CHECK_INTERVAL', 0):
+            continue
+        if connection.is_usable():
+            connection.health_checked = (connection.connection, now)
+        else:
+            connection.close()
+
+
+request_started.connect(check_connections)
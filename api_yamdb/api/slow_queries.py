@@ -0,0 +1,154 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Запрос дольше API_SLOW_QUERY_MS (с вероятностью
+API_SLOW_QUERY_SAMPLE_RATE) записывается строкой JSON в
+API_SLOW_QUERY_LOG. Считает время execute_wrapper из api.metrics,
+поэтому журнал работает при включённых метриках. К записи
+прилагаются:
+- форма запроса: литералы и списки IN заменены на ?;
+- вьюха (TitleViewSet, ReviewViewSet, ...);
+- поле сериализатора, при выводе которого выполнен запрос;
+- план: EXPLAIN на PostgreSQL, EXPLAIN QUERY PLAN на SQLite;
+- для SELECT/WITH — текст запроса с параметрами для разбора вне
+  запроса. У записи (INSERT/UPDATE/DELETE) в параметрах email, хеши
+  паролей, коды и тела писем, поэтому от неё остаётся только форма.
+
+Стек вызовов разбирается только для медленных запросов. В запросе план
+только оценивается: EXPLAIN без ANALYZE не выполняет SELECT повторно.
+Фактические время и буферы снимает python manage.py slow_queries
+--analyze по сохранённому тексту. Топ форм по суммарному времени —
+python manage.py slow_queries.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.fields import Field
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from .serializers import ReadSerializer
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+EXPLAIN_PREFIXES = ('SELECT', 'WITH')
+
+_lock = threading.Lock()
+
+
+def normalize(sql):
+    """Форма запроса без литералов: одна строка на все значения."""
+    shape = LITERAL_RE.sub('?', sql.replace('%s', '?'))
+    return ' '.join(IN_LIST_RE.sub('(...)', shape).split())
+
+
+def serializer_field(frame):
+    """'Сериализатор.поле' ближайшего по стеку вывода или проверки."""
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if isinstance(owner, ListSerializer):
+            return f'{type(owner.child).__name__}[]'
+        if isinstance(owner, BaseSerializer):
+            field = frame.f_locals.get('field')
+            if isinstance(field, Field):
+                return f'{type(owner).__name__}.{field.field_name}'
+            return type(owner).__name__
+        if isinstance(owner, ReadSerializer):
+            return type(owner).__name__
+        frame = frame.f_back
+    return None
+
+
+def explain(connection, sql, params, analyze=False):
+    """План запроса или None для СУБД и запросов без поддержки.
+
+    analyze=True выполняет запрос (EXPLAIN ANALYZE, только PostgreSQL) в
+    откатываемой транзакции; в обработке запроса API не используется.
+    """
+    if not sql.lstrip().upper().startswith(EXPLAIN_PREFIXES):
+        return None
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS)' if analyze else 'EXPLAIN'
+    elif connection.vendor == 'sqlite' and not analyze:
+        prefix = 'EXPLAIN QUERY PLAN'
+    else:
+        return None
+    try:
+        # Ошибка EXPLAIN не должна ломать транзакцию запроса.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f'{prefix} {sql}', params)
+                rows = cursor.fetchall()
+            transaction.set_rollback(True, using=connection.alias)
+    except Exception as error:
+        return f'EXPLAIN failed: {error}'
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def write(entry):
+    path = settings.API_SLOW_QUERY_LOG
+    # Параметры-даты и Decimal пишутся строками: СУБД приведёт их сама.
+    line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+    with _lock:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as log:
+            log.write(line)
+
+
+def capture(record, sql, params, many, connection, duration):
+    """Записывает медленный запрос; record — запись api.metrics."""
+    if random.random() >= settings.API_SLOW_QUERY_SAMPLE_RATE:
+        return
+    request = record.request
+    match = request and request.resolver_match
+    readable = (not many
+                and sql.lstrip().upper().startswith(EXPLAIN_PREFIXES))
+    write({
+        'time': timezone.now().isoformat(),
+        'view': match.func.__name__ if match else None,
+        'field': serializer_field(sys._getframe(1)),
+        'duration_ms': round(duration * 1000, 3),
+        'shape': normalize(sql),
+        'plan': explain(connection, sql, params) if readable else None,
+        'sql': sql if readable else None,
+        'params': list(params or ()) if readable else None,
+    })
+
+
+def read(path):
+    """Записи журнала; битые строки (обрыв при записи) пропускаются."""
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def top_shapes(entries, limit, order='total_ms'):
+    """Формы запросов с числом, суммой и максимумом времени."""
+    shapes = {}
+    for entry in entries:
+        shape = shapes.setdefault(entry['shape'], {
+            'shape': entry['shape'], 'count': 0, 'total_ms': 0.0,
+            'max_ms': 0.0, 'views': set(), 'fields': set(), 'plan': None,
+            'sql': None, 'params': None,
+        })
+        shape['count'] += 1
+        shape['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= shape['max_ms']:
+            shape['max_ms'] = entry['duration_ms']
+            shape['plan'] = entry['plan'] or shape['plan']
+            if entry.get('sql'):
+                shape['sql'] = entry['sql']
+                shape['params'] = entry.get('params')
+        for key, values in (('view', 'views'), ('field', 'fields')):
+            if entry[key]:
+                shape[values].add(entry[key])
+    return sorted(shapes.values(), key=lambda shape: shape[order],
+                  reverse=True)[:limit]
@@ -0,0 +1,40 @@
+"""Потоковая выдача больших списков JSON-массивом.
+
+Выборка читается через iterator(chunk_size) (на PostgreSQL — серверным
+курсором), сериализуется пачками по chunk_size и сразу отдаётся клиенту,
+поэтому память воркера не зависит от размера ответа.
+iterator() не выполняет prefetch_related, поэтому связи догружаются
+prefetch_related_objects отдельно для каждой пачки.
+"""
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+
+from .renderers import FastJSONRenderer
+
+
+def iterate_chunks(queryset, chunk_size):
+    """Пачки объектов выборки с выполненными prefetch_related."""
+    lookups = queryset._prefetch_related_lookups
+    objects = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(objects, chunk_size))
+        if not chunk:
+            return
+        if lookups:
+            prefetch_related_objects(chunk, *lookups)
+        yield chunk
+
+
+def stream_json(queryset, serializer_factory, chunk_size):
+    """Байтовые куски JSON-массива; serializer_factory(objects) -> many."""
+    renderer = FastJSONRenderer()
+    yield b'['
+    first = True
+    for chunk in iterate_chunks(queryset, chunk_size):
+        # Пачка рендерится массивом, в поток идут элементы без скобок.
+        items = renderer.render(serializer_factory(chunk).data)[1:-1]
+        if items:
+            yield items if first else b',' + items
+            first = False
+    yield b']'
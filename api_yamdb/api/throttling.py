@@ -0,0 +1,138 @@
+"""Ограничение частоты запросов по алгоритму token bucket.
+
+Ведро ёмкостью N жетонов (N из ставки 'N/период' в
+DEFAULT_THROTTLE_RATES) равномерно пополняется за период; запрос
+забирает один жетон. В отличие от скользящего окна SimpleRateThrottle
+состояние ведра — два числа, и проверка стоит O(1) без истории запросов.
+
+Хранилища (API_THROTTLE_STORE):
+- 'local' — словарь процесса с вытеснением давно не использованных ключей
+  (не больше API_THROTTLE_MAX_KEYS); у каждого воркера свои вёдра;
+- 'cache' — кэш Django (API_THROTTLE_CACHE_ALIAS), общий для воркеров.
+  Чтение и запись не атомарны: при гонке пройдёт на пару запросов больше.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+# Атрибут HttpRequest, из которого middleware берёт заголовки квоты.
+RATE_LIMIT_ATTR = 'rate_limit'
+
+
+def refill(state, capacity, rate, now):
+    """Жетоны в ведре на момент now; пустое состояние — полное ведро."""
+    if state is None:
+        return capacity
+    tokens, updated = state
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class LocalBucketStore:
+    """Вёдра в памяти процесса, LRU-вытеснение сверх max_keys."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+
+    def take(self, key, capacity, rate, now):
+        """Пытается взять жетон; возвращает (успех, осталось жетонов)."""
+        with self.lock:
+            tokens = refill(self.buckets.get(key), capacity, rate, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > self.max_keys:
+                # Вытесненный ключ вернётся с полным ведром.
+                self.buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """Вёдра в кэше Django; ключ живёт, пока ведро не наполнится."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def take(self, key, capacity, rate, now):
+        cache = caches[self.alias]
+        tokens = refill(cache.get(key), capacity, rate, now)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(key, (tokens, now), int((capacity - tokens) / rate) + 1)
+        return allowed, tokens
+
+    def clear(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    if settings.API_THROTTLE_STORE == 'cache':
+        return CacheBucketStore(settings.API_THROTTLE_CACHE_ALIAS)
+    return LocalBucketStore(settings.API_THROTTLE_MAX_KEYS)
+
+
+def reset_store():
+    """Забывает хранилище и его вёдра (тесты, смена настроек)."""
+    get_store().clear()
+    get_store.cache_clear()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ставка по throttle_scope вьюхи (или default_scope), ключ — user/IP."""
+
+    default_scope = 'api'
+    # Для 'auth' ключ всегда IP: перебор кодов не должен зависеть от токена.
+    ip_scopes = ('auth',)
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        # Ставка известна только вместе со вьюхой.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', self.default_scope)
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        self.refill_rate = self.num_requests / self.duration
+        allowed, self.tokens = get_store().take(
+            self.key, self.num_requests, self.refill_rate, time.time()
+        )
+        setattr(request._request, RATE_LIMIT_ATTR, {
+            'X-RateLimit-Limit': f'{self.num_requests}',
+            'X-RateLimit-Remaining': f'{int(self.tokens)}',
+        })
+        return allowed
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        user = request.user
+        if user and user.is_authenticated and self.scope not in self.ip_scopes:
+            ident = f'user-{user.pk}'
+        else:
+            ident = f'ip-{self.get_ident(request)}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def wait(self):
+        """Секунд до появления следующего жетона (для Retry-After)."""
+        return math.ceil((1 - self.tokens) / self.refill_rate)
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+from .views import (CategoryViewSet, CommentViewSet, GenreViewSet, MetricsView,
                     RegistrationViewSet, ReviewViewSet, TitleViewSet,
                     TokenObtainViewset, UserViewSet)
 
@@ -23,5 +23,6 @@ router.register('titles', TitleViewSet, basename='titles')
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/token/', TokenObtainViewset.as_view(
-        actions={'post': 'update'}))
+        actions={'post': 'update'}), name='token'),
+    path('v1/_metrics', MetricsView.as_view(), name='metrics'),
 ]
@@ -1,27 +1,36 @@
-import secrets
-
-from django.conf import settings
-from django.core.mail import send_mail
-from django.db import models
+from django.db import transaction
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
-
+from rest_framework.views import APIView
+from reviews.confirmation import make_code, make_nonce
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import enqueue
+from reviews.utils import SCORE_FIELDS
+from reviews.versions import get_version_and_latest
+
+from . import metrics
+from .authentication import get_access_token
 from .filters import TitleFilter
-from .mixins import CreateListDestroyViewSet
+from .mixins import (CachedResponseMixin, ConditionalGetMixin,
+                     CreateListDestroyViewSet, ReadSerializerMixin,
+                     StreamingListMixin)
+from .pagination import FeedPagination, ProjectPagination, TitlePagination
 from .permissions import (IsAdminOrSuperuser, IsAdminOrSuperuserOrReadOnly,
                           IsAuthorOrAdminOrModerator)
+from .renderers import PrometheusRenderer
 from .serializers import (AdminRegistrationSerializer, CategorySerializer,
-                          CommentSerializer, GenreSerializer,
-                          RegistrationSerializer, ReviewSerializer,
-                          TitleCreateSerializer, TitleSerializer,
+                          CommentReadSerializer, CommentSerializer,
+                          GenreSerializer, RegistrationSerializer,
+                          ReviewReadSerializer, ReviewSerializer,
+                          TitleCreateSerializer, TitleReadSerializer,
+                          TitleSerializer, TitleStatsSerializer,
                           TokenObtainSerializer, UserSerializer)
 
 
@@ -29,28 +38,49 @@ class RegistrationViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     queryset = User.objects.all()
     serializer_class = RegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_scope = 'auth'
 
     def create(self, request, *args, **kwargs):
+        # Повторная регистрация той же парой выдаёт новый код взамен
+        # истёкшего или потерянного.
+        user = User.objects.filter(
+            username=request.data.get('username'),
+            email=request.data.get('email'),
+        ).first()
+        if user is not None:
+            self.reissue_code(user)
+            return Response(self.get_serializer(user).data,
+                            status=status.HTTP_200_OK)
         response = super().create(request, *args, **kwargs)
         response.status_code = status.HTTP_200_OK
         return response
 
+    @staticmethod
+    def send_code(user):
+        enqueue(subject='Confirmation Code for Yamdb',
+                message=make_code(user), recipient=user.email)
+
+    @transaction.atomic
+    def reissue_code(self, user):
+        """Новый nonce отзывает прежние коды пользователя."""
+        user.confirmation_nonce = make_nonce()
+        user.save(update_fields=['confirmation_nonce'])
+        self.send_code(user)
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        code = secrets.token_urlsafe(nbytes=10)
-        send_mail(subject='Confirmation Code for Yamdb',
-                  message=code, from_email=settings.ADMIN_EMAIL,
-                  recipient_list=[self.request.data['email']])
-        serializer.save(confirmation_code=code)
+        self.send_code(serializer.save())
 
 
 class TokenObtainViewset(viewsets.GenericViewSet):
     permission_classes = [AllowAny]
+    throttle_scope = 'auth'
 
     def update(self, request):
         serializer = TokenObtainSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        token = RefreshToken.for_user(self.get_object())
-        return Response({"token": str(token.access_token)},
+        token = get_access_token(serializer.validated_data['user'])
+        return Response({"token": str(token)},
                         status=status.HTTP_200_OK)
 
 
@@ -69,80 +99,149 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'patch'],
             permission_classes=[IsAuthenticated], url_path='me')
     def get_or_update_current_user(self, request):
+        # request.user собран из claims токена, профилю нужна вся строка.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
         if request.method == 'PATCH':
-            serializer = self.get_serializer(request.user, data=request.data,
+            serializer = self.get_serializer(user, data=request.data,
                                              partial=True)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
-            if getattr(request.user, '_prefetched_objects_cache', None):
-                request.user._prefetched_objects_cache = {}
             return Response(serializer.data)
         return None
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(StreamingListMixin, ReadSerializerMixin,
+                    ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    read_serializer_class = ReviewReadSerializer
+    pagination_class = FeedPagination
     permission_classes = (IsAuthorOrAdminOrModerator,)
 
+    @cached_property
+    def title(self):
+        """Произведение из URL; один запрос на всё время запроса."""
+        return get_object_or_404(
+            Title.objects.only('id', 'reviews_version', 'updated_at'),
+            id=self.kwargs.get('title_id'),
+        )
+
+    def get_list_version(self, queryset):
+        # save() произведения пишет и reviews_version из памяти, затирая
+        # конкурентный сдвиг; updated_at при этом меняется, и ETag тоже.
+        return self.title.reviews_version, self.title.updated_at
+
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        queryset = Review.objects.select_related('author')
+        if self.action != 'list':
+            # Объект ищется по паре (title_id, pk): 404 и без родителя.
+            return queryset.filter(title_id=self.kwargs.get('title_id'))
+        return queryset.filter(title=self.title)
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReadSerializerMixin, ConditionalGetMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    read_serializer_class = CommentReadSerializer
+    pagination_class = FeedPagination
     permission_classes = (IsAuthorOrAdminOrModerator,)
 
+    @cached_property
+    def review(self):
+        """Отзыв из URL, принадлежащий произведению из URL."""
+        return get_object_or_404(
+            Review.objects.only('id', 'comments_version', 'updated_at'),
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
+
+    def get_list_version(self, queryset):
+        return self.review.comments_version, self.review.updated_at
+
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        return review.comments_review.all()
+        queryset = Comment.objects.select_related('author')
+        if self.action != 'list':
+            return queryset.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            )
+        return queryset.filter(review=self.review)
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.review)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedResponseMixin, ConditionalGetMixin,
+                      CreateListDestroyViewSet):
     lookup_field = 'slug'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = ProjectPagination
     filter_backends = (SearchFilter, )
     search_fields = ('name',)
     permission_classes = [IsAdminOrSuperuserOrReadOnly, ]
+    throttle_scope = 'catalog'
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedResponseMixin, ConditionalGetMixin,
+                   CreateListDestroyViewSet):
     lookup_field = 'slug'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = ProjectPagination
     filter_backends = (SearchFilter, )
     search_fields = ('name',)
     permission_classes = [IsAdminOrSuperuserOrReadOnly, ]
+    throttle_scope = 'catalog'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        rating=models.Avg('reviews__score')
-    )
-    pagination_class = LimitOffsetPagination
+class TitleViewSet(StreamingListMixin, ReadSerializerMixin,
+                   CachedResponseMixin, ConditionalGetMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.order_by('id'))
+    ).defer('search_vector')
+    read_serializer_class = TitleReadSerializer
+    pagination_class = TitlePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = [IsAdminOrSuperuserOrReadOnly, ]
+    throttle_scope = 'catalog'
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH',):
             return TitleCreateSerializer
         return TitleSerializer
+
+    def get_list_version(self, queryset):
+        """Версия таблицы и последний updated_at произведений.
+
+        Рейтинг меняют отзывы, общую версию они не сдвигают: изменение
+        видно по updated_at произведения, удаление — по версии таблицы.
+        """
+        return get_version_and_latest(Title, 'updated_at')
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        title = get_object_or_404(
+            Title.objects.only('id', *SCORE_FIELDS), pk=pk
+        )
+        return Response(TitleStatsSerializer(title).data)
+
+
+class MetricsView(APIView):
+    """Метрики запросов процесса в текстовом формате Prometheus."""
+
+    permission_classes = (IsAuthenticated, IsAdminOrSuperuser)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(
+            metrics.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -0,0 +1,14 @@
+"""ASGI-точка входа: uvicorn, daphne или gunicorn с UvicornWorker.
+
+Django 2.2 не поддерживает ASGI сам: WSGI-приложение оборачивается
+asgiref, и синхронные вьюхи выполняются в пуле потоков. Нативные
+async-вьюхи станут возможны после перехода на Django 3.1+.
+"""
+import os
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+application = WsgiToAsgi(get_wsgi_application())
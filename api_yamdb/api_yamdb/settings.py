@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'api',
@@ -24,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,6 +33,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.RateLimitHeadersMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -62,10 +65,69 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Соединение переиспользуется запросами одного потока воркера
+        # CONN_MAX_AGE секунд; 0 — новое соединение на каждый запрос.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Проверять переиспользуемое соединение в начале запроса не чаще
+        # раза в CONN_HEALTH_CHECK_INTERVAL секунд
+        # (api.signals.check_connections; с Django 4.1 — встроенная).
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='true'
+        ).lower() == 'true',
+        'CONN_HEALTH_CHECK_INTERVAL': float(os.getenv(
+            'DB_CONN_HEALTH_CHECK_INTERVAL', default=30
+        )),
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+# Server-Timing и /api/v1/_metrics; при False middleware не подключается.
+API_METRICS_ENABLED = os.getenv(
+    'API_METRICS_ENABLED', default='true'
+).lower() == 'true'
+# Сколько последних запросов хранится для квантилей в /api/v1/_metrics.
+API_METRICS_BUFFER_SIZE = 1000
+# Общий каталог снимков метрик воркеров (api.metrics); пусто — метрики
+# процесса. gunicorn.conf.py задаёт его воркерам и чистит при запуске.
+API_METRICS_DIR = os.getenv('API_METRICS_DIR') or None
+# Не реже чем раз в столько секунд воркер обновляет свой снимок.
+API_METRICS_FLUSH_INTERVAL = 1.0
+# Журнал медленных SQL с планами (api.slow_queries): порог в мс,
+# 0 — выключен; доля записываемых запросов; файл журнала (JSON Lines).
+API_SLOW_QUERY_MS = float(os.getenv('API_SLOW_QUERY_MS', default=0))
+API_SLOW_QUERY_SAMPLE_RATE = float(
+    os.getenv('API_SLOW_QUERY_SAMPLE_RATE', default=0.1)
+)
+API_SLOW_QUERY_LOG = os.getenv(
+    'API_SLOW_QUERY_LOG', default=os.path.join(BASE_DIR, 'slow_queries.log')
+)
+
+# Бэкенды кэша, которые видит только свой процесс.
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Кэш ответов каталога (категории, жанры, произведения); 0 — выключен.
+# Сброс версии сигналом видит только кэш воркера, выполнившего запись,
+# поэтому на кэше в памяти процесса он по умолчанию выключен.
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv(
+    'API_CACHE_TIMEOUT',
+    default=(0 if CACHES[API_CACHE_ALIAS]['BACKEND']
+             in PROCESS_LOCAL_CACHE_BACKENDS else 300),
+))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -106,18 +168,72 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Очередь писем: отправляет команда send_emails (reviews.outbox).
+EMAIL_OUTBOX_BATCH_SIZE = int(
+    os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=100)
+)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+# Сколько секунд забранная воркером пачка скрыта от других воркеров.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.ProjectPagination',
+    # orjson, если установлен; вывод совпадает с JSONRenderer.
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
-    'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.LimitOffsetPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.TokenBucketThrottle',
+    ),
+    # Ёмкость ведра за период; scope задаёт throttle_scope вьюхи.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth': os.getenv('THROTTLE_AUTH_RATE', default='10/min'),
+        'catalog': os.getenv('THROTTLE_CATALOG_RATE', default='600/min'),
+        'api': os.getenv('THROTTLE_API_RATE', default='120/min'),
+    },
+    # Число прокси перед приложением (nginx из infra): IP клиента — адрес,
+    # который добавил последний прокси в X-Forwarded-For. Без прокси — 0.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
+# Размер пачки при потоковой выдаче списков (?stream=true).
+API_STREAM_CHUNK_SIZE = 500
+
+# Поиск ?search= вне PostgreSQL — индекс в памяти процесса
+# (reviews.search): только для тестов и локального запуска.
+SEARCH_FALLBACK_ENABLED = os.getenv(
+    'SEARCH_FALLBACK_ENABLED', default=str(DEBUG)
+).lower() == 'true'
+
+# До скольких строк ?count=estimate считает точно (см. api.pagination).
+API_COUNT_EXACT_LIMIT = 10000
+
+# Хранилище вёдер троттлинга: 'local' (память процесса) или 'cache'.
+API_THROTTLE_STORE = os.getenv('API_THROTTLE_STORE', default='local')
+API_THROTTLE_CACHE_ALIAS = 'default'
+API_THROTTLE_MAX_KEYS = 100000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=3),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=3),
 }
 
+# Как часто claims токена (роль) сверяются с БД, в секундах.
+USER_CLAIMS_CACHE_TTL = 60
+
 ADMIN_EMAIL = 'registration@yamdb.com'
+
+# Срок действия кода подтверждения из письма, в секундах.
+CONFIRMATION_CODE_MAX_AGE = 24 * 60 * 60
@@ -0,0 +1,53 @@
+"""Настройки gunicorn; каждое значение переопределяется окружением.
+
+По умолчанию 2 * CPU + 1 воркеров gthread по GUNICORN_THREADS потоков.
+Пока поток ждёт БД, другие потоки того же воркера обслуживают запросы.
+С DB_CONN_MAX_AGE > 0 у каждого потока своё постоянное соединение,
+поэтому workers * threads не должно превышать max_connections
+PostgreSQL (100 по умолчанию) с учётом других сервисов.
+
+ASGI: GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker и приложение
+api_yamdb.asgi:application (uvicorn ставится отдельно).
+"""
+import os
+import tempfile
+
+
+def cpu_count():
+    """CPU, доступные процессу (в контейнере — с учётом cpuset)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', default=cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', default=2))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = timeout
+# За nginx: соединение держится между запросами одного клиента.
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+# Перезапуск воркера после N запросов ограничивает рост памяти;
+# разброс не даёт всем воркерам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = max_requests // 10
+# Heartbeat воркеров в tmpfs: overlayfs Docker может тормозить fsync.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+# Снимки метрик воркеров для /api/v1/_metrics (api.metrics): каталог
+# общий для всех воркеров, снимки прошлого запуска удаляются мастером.
+metrics_dir = os.getenv('API_METRICS_DIR') or os.path.join(
+    tempfile.gettempdir(), 'yamdb-metrics'
+)
+raw_env = [f'API_METRICS_DIR={metrics_dir}']
+
+
+def on_starting(server):
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith(('.json', '.json.tmp')):
+            os.remove(os.path.join(metrics_dir, name))
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                     User)
 
 
 class ReviewAdmin(admin.ModelAdmin):
@@ -34,6 +35,7 @@ admin.site.register(Comment, CommentAdmin)
 admin.site.register(User, UserAdmin)
 UserAdmin.list_display = ('email', 'username', 'first_name',
                           'last_name', 'role', 'bio', 'is_superuser')
+UserAdmin.list_filter = ('role',) + UserAdmin.list_filter
 
 
 @admin.register(Category)
@@ -52,3 +54,12 @@ class GenreAdmin(admin.ModelAdmin):
 class TitleAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'year', 'description', 'category')
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'subject', 'created_at',
+                    'attempts', 'sent_at', 'last_error')
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
+    empty_value_display = '-пусто-'
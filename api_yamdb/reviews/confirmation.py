@@ -0,0 +1,43 @@
+"""Подписанные коды подтверждения без хранения кода в БД.
+
+Код — это метка времени и HMAC (SECRET_KEY) от id пользователя с солью из
+его confirmation_nonce. Для проверки достаточно прочитать nonce по
+username; срок жизни задаёт CONFIRMATION_CODE_MAX_AGE. Смена nonce
+отзывает все выданные коды пользователя.
+"""
+import secrets
+
+from django.conf import settings
+from django.core import signing
+
+SALT = 'reviews.confirmation'
+SEPARATOR = ':'
+
+
+def make_nonce():
+    return secrets.token_hex(8)
+
+
+def get_signer(user):
+    return signing.TimestampSigner(
+        salt=f'{SALT}:{user.confirmation_nonce}', sep=SEPARATOR
+    )
+
+
+def make_code(user):
+    """Код для письма: 'метка времени:подпись', без id пользователя."""
+    return get_signer(user).sign(str(user.pk)).split(SEPARATOR, 1)[1]
+
+
+def check_code(user, code, max_age=None):
+    """True, если код выдан этому пользователю и ещё не истёк."""
+    if max_age is None:
+        max_age = settings.CONFIRMATION_CODE_MAX_AGE
+    try:
+        get_signer(user).unsign(
+            f'{user.pk}{SEPARATOR}{code}', max_age=max_age
+        )
+    except signing.BadSignature:
+        # SignatureExpired — тоже BadSignature.
+        return False
+    return True
@@ -0,0 +1,126 @@
+"""Проверка индексов: недостающие, лишние и неиспользуемые.
+
+Недостающий — у внешнего ключа или поля из list_filter админки нет
+B-tree индекса, который начинался бы с его столбца: выборка по нему (и
+каскадное удаление) читает всю таблицу. Булевы поля не проверяются —
+индекс по двум значениям планировщику почти бесполезен.
+
+Лишний — обычный индекс, столбцы которого — начало другого индекса того
+же типа или уникального ограничения: запросы он не ускоряет, а запись
+замедляет. Индекс с нестандартным классом операторов (на PostgreSQL —
+*_like с varchar_pattern_ops для LIKE 'abc%' у уникальных slug и
+username) — отдельный тип: B-tree по тому же столбцу его не заменяет.
+
+Неиспользуемый — индекс без сканирований по pg_stat_user_indexes с
+последнего сброса статистики; считается только на PostgreSQL.
+"""
+from collections import namedtuple
+
+from django.contrib import admin
+from django.db import connection
+from django.db.models import BooleanField
+
+IndexInfo = namedtuple('IndexInfo', ('columns', 'unique', 'kind'))
+
+BTREE = 'btree'
+UNUSED_SQL = """
+    SELECT s.relname, s.indexrelname, pg_relation_size(s.indexrelid)
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary
+      AND s.relname = ANY(%s)
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+OPCLASSES_SQL = """
+    SELECT c.relname, array_agg(o.opcname ORDER BY o.opcname)
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_opclass o ON o.oid = ANY(i.indclass)
+    WHERE t.relname = %s AND NOT o.opcdefault
+    GROUP BY c.relname
+"""
+
+
+def custom_opclasses(cursor, table):
+    """{индекс: классы операторов не по умолчанию}; {} вне PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return {}
+    cursor.execute(OPCLASSES_SQL, [table])
+    return dict(cursor.fetchall())
+
+
+def table_indexes(cursor, table):
+    """{имя: IndexInfo} индексов, уникальных ограничений и ключа таблицы."""
+    constraints = connection.introspection.get_constraints(cursor, table)
+    opclasses = custom_opclasses(cursor, table)
+    indexes = {}
+    for name, info in constraints.items():
+        if not (info['index'] or info['unique'] or info['primary_key']):
+            continue
+        if None in info['columns']:
+            # Индекс по выражению со столбцами не сравнить.
+            continue
+        kind = info.get('type') or BTREE
+        kind = BTREE if kind == 'idx' else kind
+        if opclasses.get(name):
+            # get_constraints Django 2.2 отдаёт *_like как обычный B-tree.
+            kind = ':'.join([kind, *opclasses[name]])
+        indexes[name] = IndexInfo(
+            tuple(info['columns']), info['unique'] or info['primary_key'],
+            kind,
+        )
+    return indexes
+
+
+def filtered_columns(model):
+    """Столбцы, по которым выбираются строки: ключи и list_filter."""
+    fields = [field for field in model._meta.concrete_fields
+              if field.many_to_one or field.one_to_one]
+    model_admin = admin.site._registry.get(model)
+    for name in getattr(model_admin, 'list_filter', ()):
+        if not isinstance(name, str) or '__' in name:
+            continue
+        field = model._meta.get_field(name)
+        if field.many_to_many or isinstance(field, BooleanField):
+            continue
+        if field.concrete:
+            fields.append(field)
+    return list(dict.fromkeys(field.column for field in fields))
+
+
+def missing(model, indexes):
+    """Столбцы модели, которыми не начинается ни один B-tree индекс."""
+    leading = {index.columns[0] for index in indexes.values()
+               if index.kind == BTREE}
+    return [column for column in filtered_columns(model)
+            if column not in leading]
+
+
+def redundant(indexes):
+    """Пары (лишний индекс, индекс, который его покрывает)."""
+    found = []
+    for name, index in sorted(indexes.items()):
+        if index.unique:
+            continue
+        for other, cover in sorted(indexes.items()):
+            if other == name or cover.kind != index.kind:
+                continue
+            if cover.columns[:len(index.columns)] != index.columns:
+                continue
+            same = cover.columns == index.columns and not cover.unique
+            if same and other > name:
+                # Из двух одинаковых индексов лишним считается второй.
+                continue
+            found.append((name, other))
+            break
+    return found
+
+
+def unused(tables):
+    """(таблица, индекс, байт) без сканирований; None вне PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(UNUSED_SQL, [list(tables)])
+        return cursor.fetchall()
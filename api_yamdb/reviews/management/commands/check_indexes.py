@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from reviews import indexes
+
+
+class Command(BaseCommand):
+    """Недостающие, лишние и неиспользуемые индексы таблиц приложения."""
+
+    help = 'Report missing, redundant and unused database indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--app', action='append', dest='apps',
+                            help='App label, reviews by default.')
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Exit with an error on missing or redundant indexes.',
+        )
+
+    def handle(self, *args, **options):
+        models = [
+            model for label in options['apps'] or ['reviews']
+            for model in apps.get_app_config(label).get_models()
+            if model._meta.managed
+        ]
+        problems = 0
+        with connection.cursor() as cursor:
+            for model in models:
+                table = model._meta.db_table
+                found = indexes.table_indexes(cursor, table)
+                for column in indexes.missing(model, found):
+                    problems += 1
+                    self.stdout.write(
+                        f'kind=missing table={table} column={column}'
+                    )
+                for name, cover in indexes.redundant(found):
+                    problems += 1
+                    self.stdout.write(f'kind=redundant table={table} '
+                                      f'index={name} covered_by={cover}')
+        unused = indexes.unused(model._meta.db_table for model in models)
+        if unused is None:
+            self.stdout.write('kind=unused skipped=needs-postgresql')
+        for table, name, size in unused or ():
+            self.stdout.write(f'kind=unused table={table} index={name} '
+                              f'size_kb={size // 1024}')
+        if options['fail'] and problems:
+            raise CommandError(f'{problems} missing or redundant indexes.')
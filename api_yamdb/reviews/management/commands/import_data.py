@@ -0,0 +1,56 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from reviews.importers import IMPORT_SPECS, ImportRowError, load_all
+from reviews.signals import bulk_changed
+
+
+class Command(BaseCommand):
+    """Загрузка всех csv из static/data пачками, по файлу на транзакцию."""
+
+    help = 'Import static/data/*.csv in dependency order.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data-dir', default='static/data')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        # Пул окупается только при свободных ядрах и медленной записи
+        # (benchmarks/import_data.py), поэтому по умолчанию его нет.
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Processes converting csv rows; 1 converts in-process.',
+        )
+        parser.add_argument(
+            '--queue-size', type=int, default=None,
+            help='Max batches in flight (default: 2 * workers).',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            totals = load_all(
+                options['data_dir'], options['batch_size'],
+                workers=options['workers'],
+                queue_size=options['queue_size'],
+                report=self.report,
+            )
+        except ImportRowError as error:
+            raise CommandError(str(error)) from error
+        for spec in IMPORT_SPECS:
+            if spec.filename not in totals:
+                self.stdout.write(f'{spec.filename}: not found, skipped')
+        call_command('rebuild_ratings', stdout=self.stdout)
+        bulk_changed.send(sender=self.__class__)
+        total = sum(totals.values())
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Total: {total} rows in {elapsed:.1f}s '
+            f'({total / elapsed if elapsed else 0:.0f} rows/s, '
+            f'workers={options["workers"]})'
+        ))
+
+    def report(self, filename, rows, elapsed):
+        self.stdout.write(
+            f'{filename}: {rows} rows, '
+            f'{rows / elapsed if elapsed else 0:.0f} rows/s'
+        )
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from reviews.models import Review, Title
+from reviews.signals import bulk_changed
+from reviews.utils import SCORE_FIELDS, SCORES
+
+
+class Command(BaseCommand):
+    """Пересчёт хранимых гистограмм оценок произведений по отзывам."""
+
+    help = 'Rebuild or verify Title.score_1..score_10 from reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report titles with stale counters, do not write.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        totals = {}
+        counts = Review.objects.filter(score__in=SCORES).order_by().values(
+            'title', 'score'
+        ).annotate(count=Count('id'))
+        for row in counts:
+            histogram = totals.setdefault(
+                row['title'], dict.fromkeys(SCORES, 0)
+            )
+            histogram[row['score']] = row['count']
+        empty = dict.fromkeys(SCORES, 0)
+        now = timezone.now()
+        with transaction.atomic():
+            stale = []
+            titles = Title.objects.select_for_update().only(
+                'id', *SCORE_FIELDS
+            )
+            for title in titles.iterator():
+                expected = totals.get(title.id, empty)
+                if title.score_histogram != expected:
+                    for score, count in expected.items():
+                        setattr(title, f'score_{score}', count)
+                    title.updated_at = now
+                    stale.append(title)
+            if not options['check']:
+                Title.objects.bulk_update(
+                    stale, SCORE_FIELDS + ['updated_at'],
+                    batch_size=options['batch_size'],
+                )
+                if stale:
+                    bulk_changed.send(sender=self.__class__)
+        if options['check'] and stale:
+            raise CommandError(
+                f'{len(stale)} titles have stale rating counters: '
+                + ', '.join(str(title.id) for title in stale[:20])
+            )
+        if options['check']:
+            self.stdout.write('Rating counters are up to date.')
+        else:
+            self.stdout.write(f'Rebuilt rating counters: {len(stale)} titles.')
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:16
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_SEARCH_SQL = (
+    '''
+    CREATE FUNCTION reviews_title_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A')
+            || setweight(
+                to_tsvector('russian', coalesce(NEW.description, '')), 'B'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER reviews_title_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update()
+    ''',
+    'UPDATE reviews_title SET name = name',
+    '''
+    CREATE INDEX reviews_title_search_vector_gin
+    ON reviews_title USING gin (search_vector)
+    ''',
+)
+
+DROP_SEARCH_SQL = (
+    'DROP INDEX IF EXISTS reviews_title_search_vector_gin',
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger '
+    'ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_vector_update()',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for sql in statements:
+                schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_postgresql(CREATE_SEARCH_SQL),
+            run_postgresql(DROP_SEARCH_SQL),
+        ),
+    ]
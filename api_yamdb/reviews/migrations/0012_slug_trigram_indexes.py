@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:30
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+CREATE_TRIGRAM_SQL = (
+    'CREATE INDEX reviews_category_slug_trgm '
+    'ON reviews_category USING gin (slug gin_trgm_ops)',
+    'CREATE INDEX reviews_genre_slug_trgm '
+    'ON reviews_genre USING gin (slug gin_trgm_ops)',
+)
+
+DROP_TRIGRAM_SQL = (
+    'DROP INDEX IF EXISTS reviews_category_slug_trgm',
+    'DROP INDEX IF EXISTS reviews_genre_slug_trgm',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for sql in statements:
+                schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            run_postgresql(CREATE_TRIGRAM_SQL),
+            run_postgresql(DROP_TRIGRAM_SQL),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:40
+
+from django.db import migrations, models
+import reviews.confirmation
+
+
+def fill_empty_nonces(apps, schema_editor):
+    # Пользователи, которым код не выдавали, получают свою соль, как и
+    # все новые.
+    User = apps.get_model('reviews', 'User')
+    empty = User.objects.filter(confirmation_nonce='')
+    for pk in list(empty.values_list('pk', flat=True)):
+        User.objects.filter(pk=pk).update(
+            confirmation_nonce=reviews.confirmation.make_nonce()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_outgoing_email'),
+    ]
+
+    operations = [
+        # Старые коды случайны и уникальны для пользователя — годятся
+        # как nonce; выданные по ним письма перестают действовать.
+        migrations.RenameField(
+            model_name='user',
+            old_name='confirmation_code',
+            new_name='confirmation_nonce',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_nonce',
+            field=models.CharField(default=reviews.confirmation.make_nonce, editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_empty_nonces, migrations.RunPython.noop),
+    ]
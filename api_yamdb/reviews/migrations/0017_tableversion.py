@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+VERSIONED_TABLES = ('reviews_category', 'reviews_genre', 'reviews_title')
+
+
+def create_versions(apps, schema_editor):
+    TableVersion = apps.get_model('reviews', 'TableVersion')
+    TableVersion.objects.bulk_create(
+        TableVersion(table=table) for table in VERSIONED_TABLES
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_review_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Таблица')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия таблицы',
+                'verbose_name_plural': 'Версии таблиц',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
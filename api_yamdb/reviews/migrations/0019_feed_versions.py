@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0018_review_score_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_version',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Версия ленты комментариев'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_version',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Версия ленты отзывов'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
-from .utils import ADMIN, MODERATOR, USER
+from .confirmation import make_nonce
+from .utils import (ADMIN, MAX_SCORE, MIN_SCORE, MODERATOR, SCORES, USER,
+                    histogram_rating)
 from .validators import username_not_me, validate_year
 
 
@@ -27,10 +31,21 @@ class User(AbstractUser):
         error_messages={
             'unique': "A user with that username already exists.",
         },)
-    confirmation_code = models.CharField(max_length=100)
-    role = models.CharField(max_length=20, choices=ROLES, default=USER)
+    confirmation_nonce = models.CharField(
+        max_length=100, default=make_nonce, editable=False,
+    )
+    role = models.CharField(max_length=20, choices=ROLES, default=USER,
+                            db_index=True)
     bio = models.CharField(max_length=200, default='')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'username' in field_names:
+            # Переименование автора сигналы переносят в версии лент.
+            instance._loaded_username = instance.username
+        return instance
+
     @property
     def is_admin(self):
         return self.role == ADMIN
@@ -51,6 +66,10 @@ class Category(models.Model):
         max_length=50,
         verbose_name='Идентификатор категории'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Категория'
@@ -67,6 +86,10 @@ class Genre(models.Model):
         max_length=50,
         verbose_name='Идентификатор жанра'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Жанр'
@@ -94,6 +117,49 @@ class Title(models.Model):
         related_name="titles",
         verbose_name='Категория'
     )
+    # Гистограмма оценок отзывов, поддерживается сигналами.
+    score_1 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «1»'
+    )
+    score_2 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «2»'
+    )
+    score_3 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «3»'
+    )
+    score_4 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «4»'
+    )
+    score_5 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «5»'
+    )
+    score_6 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «6»'
+    )
+    score_7 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «7»'
+    )
+    score_8 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «8»'
+    )
+    score_9 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «9»'
+    )
+    score_10 = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Оценок «10»'
+    )
+    # Индекс нужен ETag списка произведений: он берёт MAX(updated_at).
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+    # Версия ленты отзывов произведения, сдвигается сигналами отзывов.
+    reviews_version = models.BigIntegerField(
+        default=0, editable=False, verbose_name='Версия ленты отзывов'
+    )
+    # Заполняется триггером БД (PostgreSQL), см. reviews.search.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = 'Произведение'
@@ -102,13 +168,54 @@ class Title(models.Model):
     def __str__(self):
         return self.name[:20]
 
+    @property
+    def score_histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def rating_count(self):
+        return sum(self.score_histogram.values())
+
+    @property
+    def rating_sum(self):
+        return sum(
+            score * count for score, count in self.score_histogram.items()
+        )
+
+    @property
+    def rating(self):
+        """Средняя оценка по хранимой гистограмме отзывов."""
+        return histogram_rating(self.score_histogram)
+
+    @property
+    def rating_mean(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def rating_median(self):
+        count = self.rating_count
+        if not count:
+            return None
+        middle = ((count - 1) // 2, count // 2)
+        values, seen = [], 0
+        for score, score_count in self.score_histogram.items():
+            values += [score for position in middle
+                       if seen <= position < seen + score_count]
+            seen += score_count
+        return sum(values) / 2
+
 
 class Review(models.Model):
+    # Отдельные индексы внешних ключей не нужны: title ведёт
+    # review_title_pub_date_idx, author — unique_review.
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
         related_name='reviews',
-        verbose_name='Произведение'
+        verbose_name='Произведение',
+        db_index=False,
     )
     text = models.TextField(
         verbose_name='Текст отзыва'
@@ -117,7 +224,8 @@ class Review(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='reviews',
-        verbose_name='Автор'
+        verbose_name='Автор',
+        db_index=False,
     )
     score = models.PositiveSmallIntegerField(
         verbose_name='Оценка',
@@ -131,11 +239,29 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата добавления'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    # Версия ленты комментариев отзыва, сдвигается сигналами комментариев.
+    comments_version = models.BigIntegerField(
+        default=0, editable=False, verbose_name='Версия ленты комментариев'
+    )
 
     class Meta:
         constraints = (
             models.UniqueConstraint(fields=('author', 'title'),
-                                    name='unique_review'),)
+                                    name='unique_review'),
+            # Оценка вне 1..10 не доходит до post_save и гистограммы.
+            models.CheckConstraint(
+                check=models.Q(score__gte=MIN_SCORE, score__lte=MAX_SCORE),
+                name='review_score_range',
+            ),
+        )
+        indexes = (
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+        )
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('-pub_date',)
@@ -143,30 +269,115 @@ class Review(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'title_id' in field_names and 'score' in field_names:
+            # Исходная оценка нужна сигналам для пересчёта рейтинга.
+            instance._loaded_score = (instance.title_id, instance.score)
+        return instance
+
 
 class Comment(models.Model):
     text = models.TextField(
         verbose_name='Комментарий'
     )
+    # Внешние ключи ведут составные индексы из Meta.indexes.
     author = models.ForeignKey(
         User, on_delete=models.CASCADE,
         related_name='comments_author',
-        verbose_name='Автор'
+        verbose_name='Автор',
+        db_index=False,
     )
     review = models.ForeignKey(
         Review, on_delete=models.CASCADE,
         related_name='comments_review',
-        verbose_name='Отзыв'
+        verbose_name='Отзыв',
+        db_index=False,
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата добавления'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
+        indexes = (
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+            models.Index(fields=('author', 'pub_date', 'id'),
+                         name='comment_author_pub_date_idx'),
+        )
         verbose_name = "Комментарий к отзыву"
         verbose_name_plural = "Комментарии к отзыву"
         ordering = ('-pub_date',)
 
     def __str__(self):
         return self.text[:15]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди отправки (outbox).
+
+    Создаётся в той же транзакции, что и данные, о которых оно сообщает;
+    отправляет его команда send_emails.
+    """
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(max_length=254, verbose_name='Получатель')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    sent_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name='Дата отправки'
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('sent_at', 'next_attempt_at'),
+                         name='outgoing_email_pending_idx'),
+        )
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
+class TableVersion(models.Model):
+    """Счётчик изменений таблицы для ETag списков (см. reviews.versions).
+
+    Сдвигается в транзакции каждой записи, меняющей представление строк
+    таблицы, поэтому версия списка читается по первичному ключу, без
+    агрегата по выборке.
+    """
+
+    table = models.CharField(
+        max_length=100, primary_key=True,
+        verbose_name='Таблица'
+    )
+    version = models.BigIntegerField(default=0, verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия таблицы'
+        verbose_name_plural = 'Версии таблиц'
+
+    def __str__(self):
+        return f'{self.table}: {self.version}'
@@ -0,0 +1,121 @@
+"""Очередь исходящих писем (transactional outbox).
+
+Запрос только записывает письмо в таблицу OutgoingEmail в своей
+транзакции; если транзакция откатится, письмо не уйдёт. Отправкой
+занимается команда send_emails: она забирает пачку готовых писем,
+отправляет их через одно соединение с почтовым сервером и откладывает
+неудачные с экспоненциальной задержкой.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue(subject, message, recipient, from_email=None):
+    """Ставит письмо в очередь; вызывайте внутри транзакции запроса."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        recipient=recipient,
+        from_email=from_email or settings.ADMIN_EMAIL,
+    )
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: base * 2^(n-1), не больше max."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def defer(email, error, now):
+    """Откладывает письмо после неудачной попытки (попытка уже учтена)."""
+    email.next_attempt_at = now + retry_delay(email.attempts)
+    email.last_error = f'{type(error).__name__}: {error}'
+
+
+def pending(now=None):
+    """Письма, которые пора отправить (и попытки ещё не исчерпаны)."""
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now or timezone.now(),
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim(batch_size):
+    """Забирает пачку в короткой транзакции и сразу её фиксирует.
+
+    Попытка засчитывается заранее, а next_attempt_at сдвигается на
+    EMAIL_OUTBOX_CLAIM_TIMEOUT: пока воркер отправляет письма, другие их
+    не видят, а если он упадёт, письма вернутся в очередь по истечении
+    срока.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            pending(now).select_for_update(skip_locked=True)[:batch_size]
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+            )
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'next_attempt_at')
+        )
+    return emails
+
+
+def send_batch(batch_size=None):
+    """Отправляет одну пачку; возвращает (отправлено, ошибок).
+
+    Письма забираются claim(), отправляются вне транзакции (строки не
+    держатся заблокированными, пока идёт SMTP), а результаты пишутся
+    второй короткой транзакцией. Если воркер упадёт между отправкой и
+    записью, письмо уйдёт повторно: доставка «хотя бы один раз».
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = failed = 0
+    emails = claim(batch_size)
+    if not emails:
+        return sent, failed
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        # Сервер недоступен: откладываем всю пачку.
+        now = timezone.now()
+        for email in emails:
+            defer(email, error, now)
+        failed = len(emails)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject, body=email.message,
+                    from_email=email.from_email, to=[email.recipient],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    defer(email, error, timezone.now())
+                    failed += 1
+                else:
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent += 1
+        finally:
+            connection.close()
+    with transaction.atomic():
+        OutgoingEmail.objects.bulk_update(
+            emails, ('next_attempt_at', 'last_error', 'sent_at')
+        )
+    return sent, failed
@@ -0,0 +1,134 @@
+"""Полнотекстовый поиск произведений по названию и описанию.
+
+На PostgreSQL используется колонка Title.search_vector (GIN-индекс,
+заполняется триггером при любой записи) и ts_rank. На других СУБД —
+инвертированный индекс в памяти процесса с тем же смыслом запроса:
+все слова должны встретиться, название весит больше описания.
+
+Запасной индекс — только для тестов и локального запуска в одном
+процессе: он обновляется сигналами своего процесса и не видит записей
+других воркеров и массового импорта. Поэтому он работает только при
+SEARCH_FALLBACK_ENABLED (по умолчанию — при DEBUG), иначе поиск вне
+PostgreSQL отклоняется SearchError. Порядок по релевантности передаётся
+в SQL списком id, поэтому совпадений не больше FALLBACK_LIMIT: запрос
+шире тоже отклоняется, а не обрезается молча.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, IntegerField, When
+
+from .models import Title
+
+SEARCH_CONFIG = 'russian'
+# Сколько совпадений упорядочивает запасной индекс.
+FALLBACK_LIMIT = 500
+# Веса как у setweight 'A' и 'B' в ts_rank по умолчанию.
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+WORD_RE = re.compile(r'\w+')
+
+
+class SearchError(Exception):
+    """Запрос нельзя выполнить полнотекстовым поиском на этой СУБД."""
+
+
+def tokenize(text):
+    return WORD_RE.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """Слово -> {id произведения: вес}; обновляется сигналами Title."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = None
+        self.documents = {}
+
+    def build(self):
+        postings = defaultdict(dict)
+        documents = {}
+        titles = Title.objects.values_list('id', 'name', 'description')
+        for pk, name, description in titles.iterator():
+            documents[pk] = self._add(postings, pk, name, description)
+        self.postings, self.documents = postings, documents
+
+    @staticmethod
+    def _add(postings, pk, name, description):
+        words = set()
+        for tokens, weight in ((tokenize(name), NAME_WEIGHT),
+                               (tokenize(description), DESCRIPTION_WEIGHT)):
+            for token in tokens:
+                postings[token][pk] = postings[token].get(pk, 0) + weight
+                words.add(token)
+        return words
+
+    def _remove(self, pk):
+        for token in self.documents.pop(pk, ()):
+            self.postings[token].pop(pk, None)
+            if not self.postings[token]:
+                del self.postings[token]
+
+    def update(self, title):
+        with self.lock:
+            if self.postings is None:
+                return
+            self._remove(title.pk)
+            self.documents[title.pk] = self._add(
+                self.postings, title.pk, title.name, title.description
+            )
+
+    def delete(self, pk):
+        with self.lock:
+            if self.postings is not None:
+                self._remove(pk)
+
+    def reset(self):
+        with self.lock:
+            self.postings = None
+            self.documents = {}
+
+    def search(self, text):
+        """Список id по убыванию релевантности."""
+        with self.lock:
+            if self.postings is None:
+                self.build()
+            tokens = set(tokenize(text))
+            if not tokens:
+                return []
+            matches = [self.postings.get(token, {}) for token in tokens]
+            ids = set.intersection(*(set(match) for match in matches))
+            ranks = {
+                pk: sum(match[pk] for match in matches) for pk in ids
+            }
+        return sorted(ranks, key=lambda pk: (-ranks[pk], pk))
+
+
+title_index = InvertedIndex()
+
+
+def search_titles(queryset, text):
+    """Фильтрует и сортирует произведения по релевантности запросу."""
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', 'id')
+    if not settings.SEARCH_FALLBACK_ENABLED:
+        raise SearchError('Full-text search requires PostgreSQL.')
+    ids = title_index.search(text)
+    if len(ids) > FALLBACK_LIMIT:
+        raise SearchError(
+            f'More than {FALLBACK_LIMIT} matches; refine the query.'
+        )
+    if not ids:
+        return queryset.none()
+    return queryset.filter(pk__in=ids).order_by(Case(
+        *(When(pk=pk, then=position) for position, pk in enumerate(ids)),
+        output_field=IntegerField(),
+    ))
@@ -0,0 +1,140 @@
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title, User
+from .search import title_index
+from .utils import SCORES
+from .versions import bump
+
+# Массовая запись мимо save()/delete() (import_data, rebuild_ratings):
+# post_save не приходит, кэши сбрасываются по этому сигналу.
+bulk_changed = Signal()
+
+
+def touch(titles):
+    """Сдвигает updated_at произведений, чьё представление изменилось."""
+    titles.update(updated_at=timezone.now())
+    bump(Title)
+
+
+def update_title(title_id, scores=()):
+    """Применяет к произведению изменения гистограммы одним UPDATE.
+
+    scores — пары (оценка, знак): sign=1 добавляет оценку, sign=-1
+    вычитает. Имя колонки строится из оценки, поэтому она проверяется
+    заранее. Новые оценки вне 1..10 отсекает ограничение
+    review_score_range ещё до записи; старые строки вне диапазона в
+    гистограмму не попадали, и вычитать их незачем — сигнал не должен
+    мешать их удалению. Версия ленты отзывов произведения сдвигается
+    всегда: её ETag зависит и от текста отзывов.
+    """
+    updates = {'reviews_version': F('reviews_version') + 1}
+    for score, sign in scores:
+        if score in SCORES:
+            updates[f'score_{score}'] = F(f'score_{score}') + sign
+            updates['updated_at'] = timezone.now()
+    Title.objects.filter(pk=title_id).update(**updates)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_score', None)
+    title_id, score = current = (instance.title_id, instance.score)
+    instance._loaded_score = current
+    if created:
+        update_title(title_id, [(score, 1)])
+    elif loaded is None or loaded == current:
+        update_title(title_id)
+    elif loaded[0] == title_id:
+        update_title(title_id, [(loaded[1], -1), (score, 1)])
+    else:
+        update_title(loaded[0], [(loaded[1], -1)])
+        update_title(title_id, [(score, 1)])
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    title_id, score = (getattr(instance, '_loaded_score', None)
+                       or (instance.title_id, instance.score))
+    update_title(title_id, [(score, -1)])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            comments_version=F('comments_version') + 1
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, raw=False, **kwargs):
+    if not raw and not kwargs.get('created'):
+        touch(Title.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def genre_changed(sender, instance, raw=False, **kwargs):
+    if not raw and not kwargs.get('created'):
+        touch(Title.objects.filter(genre=instance))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch(Title.objects.filter(pk=instance.pk))
+    elif action == 'pre_clear':
+        touch(Title.objects.filter(genre=instance))
+    else:
+        touch(Title.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, raw=False, **kwargs):
+    """Автор в отзывах и комментариях — username: сдвигает их updated_at."""
+    loaded = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if raw or created or loaded in (None, instance.username):
+        return
+    now = timezone.now()
+    Review.objects.filter(author=instance).update(updated_at=now)
+    Comment.objects.filter(author=instance).update(updated_at=now)
+    Title.objects.filter(reviews__author=instance).update(
+        reviews_version=F('reviews_version') + 1
+    )
+    Review.objects.filter(comments_review__author=instance).update(
+        comments_version=F('comments_version') + 1
+    )
+
+
+def table_changed(sender, raw=False, **kwargs):
+    if not raw:
+        bump(sender)
+
+
+# Общие версии — только у каталога; ленты отзывов и комментариев
+# версионируются по родителю (update_title, comment_changed).
+for model in (Category, Genre, Title):
+    post_save.connect(table_changed, sender=model)
+    post_delete.connect(table_changed, sender=model)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, **kwargs):
+    title_index.update(instance)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    title_index.delete(instance.pk)
@@ -2,3 +2,15 @@ USER = 'user'
 ADMIN = 'admin'
 MODERATOR = 'moderator'
 ROLES = [USER, ADMIN, MODERATOR]
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
+SCORE_FIELDS = [f'score_{score}' for score in SCORES]
+
+
+def histogram_rating(histogram):
+    """Целая средняя оценка по гистограмме {оценка: число} или None."""
+    count = sum(histogram.values())
+    if not count:
+        return None
+    return sum(score * number for score, number in histogram.items()) // count
@@ -0,0 +1,63 @@
+"""Версии таблиц каталога для ETag списков.
+
+У категорий, жанров и произведений есть строка TableVersion. Сигналы
+(reviews.signals) и команды массовой записи сдвигают её в той же
+транзакции, что и изменение, так что версия не опережает данные и не
+отстаёт от них. Отзывы и комментарии общей версии не имеют: ленту
+отзывов версионирует Title.reviews_version, ленту комментариев —
+Review.comments_version, и запись отзыва не блокирует чужие ленты и
+не меняет их ETag.
+"""
+from django.db.models import F, Subquery
+
+from .models import Comment, Review, TableVersion, Title
+
+# Ленты с родителем: модель ленты -> (модель родителя, поле версии).
+FEED_VERSIONS = {
+    Review: (Title, 'reviews_version'),
+    Comment: (Review, 'comments_version'),
+}
+
+
+def get_table(model):
+    """Промежуточная таблица M2M относится к модели, которая её создала."""
+    return (model._meta.auto_created or model)._meta.db_table
+
+
+def bump(*models):
+    """Сдвигает версии таблиц моделей; вызывайте в транзакции записи."""
+    TableVersion.objects.filter(
+        table__in={get_table(model) for model in models}
+    ).update(version=F('version') + 1)
+
+
+def get_version(model):
+    """Текущая версия таблицы модели (0, если строки нет)."""
+    return TableVersion.objects.filter(table=get_table(model)).values_list(
+        'version', flat=True
+    ).first() or 0
+
+
+def get_version_and_latest(model, field):
+    """Версия таблицы и максимум поля-даты модели одним запросом.
+
+    Максимум берётся как ORDER BY field DESC LIMIT 1 — по индексу поля.
+    """
+    latest = model.objects.order_by(f'-{field}').values(field)[:1]
+    row = TableVersion.objects.filter(table=get_table(model)).annotate(
+        latest=Subquery(latest)
+    ).values_list('version', 'latest').first()
+    return row or (0, None)
+
+
+def bump_bulk(model):
+    """Версии после массовой записи в таблицу модели (импорт CSV).
+
+    Для лент сдвигает версии всех родителей: какие из них затронуты,
+    построчно не отслеживается.
+    """
+    if model not in FEED_VERSIONS:
+        bump(model)
+        return
+    parent, field = FEED_VERSIONS[model]
+    parent.objects.update(**{field: F(field) + 1})
@@ -0,0 +1,86 @@
+"""Обмен кода подтверждения на токен: подписанный код против хранимого.
+
+Прежний поток читал пользователя дважды (валидация кода и get_object())
+и сравнивал код из колонки; новый читает id и nonce одним запросом и
+проверяет HMAC.
+
+    python -m benchmarks.confirmation_codes --users 10000 --exchanges 1000
+"""
+import argparse
+import random
+
+from benchmarks.utils import test_database, timeit
+
+
+def seed(size, batch_size=5000):
+    from reviews.models import User
+
+    for start in range(0, size, batch_size):
+        User.objects.bulk_create(
+            User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+            for number in range(start, min(start + batch_size, size))
+        )
+
+
+def run(users, exchanges):
+    from django.db import connection
+    from reviews.confirmation import check_code, make_code
+    from reviews.models import User
+
+    rng = random.Random(users)
+    names = [f'user{rng.randrange(users)}' for _ in range(exchanges)]
+    nonces = dict(User.objects.values_list('username', 'confirmation_nonce'))
+    # В прежнем потоке кодом было значение колонки, его роль теперь у nonce.
+    legacy_codes = nonces
+    codes = {
+        user.username: make_code(user)
+        for user in User.objects.filter(username__in=set(names))
+    }
+
+    def legacy():
+        for name in names:
+            user = User.objects.get(username=name)
+            assert str(legacy_codes[name]) == str(user.confirmation_nonce)
+            User.objects.get(username=name)
+
+    def signed():
+        for name in names:
+            user = User.objects.only('id', 'confirmation_nonce').get(
+                username=name
+            )
+            assert check_code(user, codes[name])
+
+    def count_queries(func):
+        connection.force_debug_cursor = True
+        connection.queries_log.clear()
+        func()
+        connection.force_debug_cursor = False
+        return len(connection.queries_log) // exchanges
+
+    return {
+        'users': users,
+        'exchanges': exchanges,
+        'legacy_ms': timeit(legacy),
+        'legacy_queries': count_queries(legacy),
+        'signed_ms': timeit(signed),
+        'signed_queries': count_queries(signed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, nargs='+', default=[10000])
+    parser.add_argument('--exchanges', type=int, default=1000)
+    args = parser.parse_args()
+    for users in args.users:
+        with test_database():
+            seed(users)
+            result = run(users, args.exchanges)
+            print(' '.join(
+                f'{key}={value:.1f}' if isinstance(value, float)
+                else f'{key}={value}' for key, value in result.items()
+            ))
+
+
+if __name__ == '__main__':
+    main()
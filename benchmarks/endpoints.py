@@ -0,0 +1,331 @@
+"""Сквозной бенчмарк API: все маршруты api/urls.py через тестовый клиент.
+
+Синтетические данные создаются моделями reviews в масштабе из аргументов
+(--users, --titles, --reviews на произведение, ...). Каждый сценарий —
+один эндпоинт и метод с настоящим JWT-токеном. Для него меряются
+задержки p50/p95/p99, запросов в секунду у последовательного клиента и
+среднее число запросов к БД. Кэш ответов (без --cache) и ограничение
+частоты на время прогона выключены.
+
+--output сохраняет результат в JSON. --baseline сравнивает прогон с
+сохранённым: регрессия — рост числа запросов к БД или p50 больше чем на
+--tolerance (и не меньше чем на --min-delta-ms, чтобы шум
+миллисекундных эндпоинтов не считался регрессией). При регрессии код
+выхода 1.
+
+    python -m benchmarks.endpoints --output baseline.json
+    python -m benchmarks.endpoints --baseline baseline.json
+"""
+import argparse
+import io
+import json
+import sys
+import time
+
+from benchmarks.load_test import percentile
+from benchmarks.utils import test_database
+
+
+def seed(users=200, titles=500, genres=20, categories=5, reviews=10,
+         comments=2):
+    """Каталог и ленты; произведение t оценили users[(t + k) % users]."""
+    from django.core.management import call_command
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+    from reviews.search import title_index
+
+    reviews = min(reviews, users - 1)
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(categories)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(genres)
+    )
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+        for number in range(users)
+    )
+    User.objects.create_user(username='admin', email='admin@yamdb.fake',
+                             role='admin')
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    user_ids = list(User.objects.filter(role='user')
+                    .order_by('id').values_list('id', flat=True))
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=1950 + number % 70,
+              description=f'Описание произведения номер {number}',
+              category_id=category_ids[number % categories])
+        for number in range(titles)
+    )
+    title_ids = list(Title.objects.order_by('id')
+                     .values_list('id', flat=True))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for number, title_id in enumerate(title_ids)
+        for genre_id in {genre_ids[number % genres],
+                         genre_ids[(number + 1) % genres]}
+    )
+    Review.objects.bulk_create(
+        Review(title_id=title_id, author_id=user_ids[(number + k) % users],
+               text=f'Отзыв {k} на произведение {number}',
+               score=(number + k) % 10 + 1)
+        for number, title_id in enumerate(title_ids)
+        for k in range(reviews)
+    )
+    Comment.objects.bulk_create(
+        Comment(review_id=review_id, author_id=user_ids[k % users],
+                text=f'Комментарий {k}')
+        for review_id in Review.objects.values_list('id', flat=True)
+        for k in range(comments)
+    )
+    # bulk_create обходит сигналы: гистограммы и индекс поиска заново.
+    call_command('rebuild_ratings', stdout=io.StringIO())
+    title_index.reset()
+    return {'users': users, 'titles': titles, 'genres': genres,
+            'categories': categories, 'reviews': reviews,
+            'comments': comments}
+
+
+def scenarios(scale):
+    """(имя, метод, функция номера -> (url, тело), токен, код ответа)."""
+    from api.authentication import get_access_token
+    from reviews.confirmation import make_code
+    from reviews.models import Review, Title, User
+
+    users = list(User.objects.filter(role='user').order_by('id'))
+    admin = User.objects.get(username='admin')
+    titles = list(Title.objects.order_by('id').values_list('id', flat=True))
+    # Первый отзыв произведения t написал users[t % users].
+    own_reviews = {
+        (title_id, author_id): review_id
+        for review_id, title_id, author_id in Review.objects.values_list(
+            'id', 'title_id', 'author_id'
+        )
+    }
+    first_review = [own_reviews[title_id, users[number % len(users)].id]
+                    for number, title_id in enumerate(titles)]
+    tokens = {user.id: str(get_access_token(user))
+              for user in users + [admin]}
+    user_token = tokens[users[0].id]
+    admin_token = tokens[admin.id]
+    title, review = titles[0], first_review[0]
+    feed = f'/api/v1/titles/{title}/reviews/'
+    comments = f'{feed}{review}/comments/'
+
+    def get(url):
+        return lambda number: (url, None)
+
+    def author_token(number):
+        return tokens[users[number % len(users)].id]
+
+    def reviewer_token(number):
+        # Этот пользователь ещё не оценивал произведение titles[number].
+        return tokens[users[(number + scale['reviews']) % len(users)].id]
+
+    def signup(number):
+        return '/api/v1/auth/signup/', {
+            'username': f'bench{number}',
+            'email': f'bench{number}@yamdb.fake',
+        }
+
+    def token(number):
+        user = users[number % len(users)]
+        return '/api/v1/auth/token/', {
+            'username': user.username, 'confirmation_code': make_code(user),
+        }
+
+    return [
+        ('titles-list', 'get', get('/api/v1/titles/'), None, 200),
+        ('titles-filter', 'get',
+         get('/api/v1/titles/?genre=genre-1&category=category-1'),
+         None, 200),
+        ('titles-search', 'get',
+         get('/api/v1/titles/?search=произведение'), None, 200),
+        ('title-detail', 'get', get(f'/api/v1/titles/{title}/'), None, 200),
+        ('title-stats', 'get', get(f'/api/v1/titles/{title}/stats/'),
+         None, 200),
+        ('genres-list', 'get', get('/api/v1/genres/'), None, 200),
+        ('categories-list', 'get', get('/api/v1/categories/'), None, 200),
+        ('reviews-list', 'get', get(feed), None, 200),
+        ('reviews-cursor', 'get', get(f'{feed}?pagination=cursor'),
+         None, 200),
+        ('review-detail', 'get', get(f'{feed}{review}/'), None, 200),
+        ('comments-list', 'get', get(comments), None, 200),
+        ('users-list', 'get', get('/api/v1/users/'), admin_token, 200),
+        ('user-detail', 'get', get(f'/api/v1/users/{users[0].username}/'),
+         admin_token, 200),
+        ('users-me', 'get', get('/api/v1/users/me/'), user_token, 200),
+        ('review-create', 'post', lambda number: (
+            f'/api/v1/titles/{titles[number]}/reviews/',
+            {'text': 'Новый отзыв', 'score': number % 10 + 1},
+        ), reviewer_token, 201),
+        ('review-update', 'patch', lambda number: (
+            f'/api/v1/titles/{titles[number]}/reviews/'
+            f'{first_review[number]}/',
+            {'score': number % 10 + 1},
+        ), author_token, 200),
+        ('comment-create', 'post', lambda number: (
+            comments, {'text': f'Комментарий {number}'},
+        ), user_token, 201),
+        ('users-me-update', 'patch', lambda number: (
+            '/api/v1/users/me/', {'bio': f'Био {number}'},
+        ), user_token, 200),
+        ('signup', 'post', signup, None, 200),
+        ('token', 'post', token, None, 200),
+        ('user-create', 'post', lambda number: ('/api/v1/users/', {
+            'username': f'created{number}',
+            'email': f'created{number}@yamdb.fake',
+        }), admin_token, 201),
+        ('genre-create', 'post', lambda number: ('/api/v1/genres/', {
+            'name': f'Новый жанр {number}', 'slug': f'new-genre-{number}',
+        }), admin_token, 201),
+        ('title-create', 'post', lambda number: ('/api/v1/titles/', {
+            'name': f'Новое произведение {number}', 'year': 2000,
+            'genre': ['genre-0'], 'category': 'category-0',
+        }), admin_token, 201),
+    ]
+
+
+def measure(client, method, request, token, expected, numbers):
+    """Задержки в мс и запросы к БД по каждому номеру из numbers."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies, queries = [], []
+    for number in numbers:
+        url, body = request(number)
+        headers = {}
+        if token is not None:
+            value = token(number) if callable(token) else token
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {value}'
+        if body is not None:
+            headers['data'] = json.dumps(body)
+            headers['content_type'] = 'application/json'
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **headers)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != expected:
+            raise RuntimeError(
+                f'{method.upper()} {url}: {response.status_code}, '
+                f'ожидался {expected}'
+            )
+        latencies.append(elapsed)
+        queries.append(len(context.captured_queries))
+    return sorted(latencies), queries
+
+
+def run(scale, requests=50, warmup=10, cache=False):
+    from django.conf import settings
+    from django.test import Client, override_settings
+
+    rest_framework = dict(settings.REST_FRAMEWORK,
+                          DEFAULT_THROTTLE_RATES={})
+    client = Client()
+    results = {}
+    with override_settings(
+        REST_FRAMEWORK=rest_framework,
+        # Бенчмарк однопроцессный: кэш в памяти процесса и запасной
+        # индекс поиска тут корректны.
+        API_CACHE_TIMEOUT=(settings.API_CACHE_TIMEOUT or 300) if cache else 0,
+        SEARCH_FALLBACK_ENABLED=True,
+    ):
+        for name, method, request, token, expected in scenarios(scale):
+            measure(client, method, request, token, expected,
+                    range(warmup))
+            latencies, queries = measure(
+                client, method, request, token, expected,
+                range(warmup, warmup + requests),
+            )
+            results[name] = {
+                'requests': requests,
+                'rps': 1000 * requests / sum(latencies),
+                'p50_ms': percentile(latencies, 0.5),
+                'p95_ms': percentile(latencies, 0.95),
+                'p99_ms': percentile(latencies, 0.99),
+                'queries': sum(queries) / requests,
+            }
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms=1.0):
+    """Строки сравнения с базовым прогоном; (строки, есть ли регрессия)."""
+    rows, failed = [], False
+    for name, result in results.items():
+        base = baseline.get(name)
+        row = {'endpoint': name, 'p50_ms': result['p50_ms'],
+               'queries': result['queries']}
+        if base is None:
+            row['status'] = 'new'
+        else:
+            change = result['p50_ms'] / base['p50_ms'] - 1
+            row.update(base_p50_ms=base['p50_ms'],
+                       change=f'{change:+.1%}',
+                       base_queries=base['queries'])
+            reasons = []
+            if result['queries'] > base['queries']:
+                reasons.append('queries')
+            if (change > tolerance
+                    and result['p50_ms'] - base['p50_ms'] >= min_delta_ms):
+                reasons.append('latency')
+            row['status'] = ','.join(reasons) or 'ok'
+            failed = failed or bool(reasons)
+        rows.append(row)
+    return rows, failed
+
+
+def print_rows(rows):
+    for row in rows:
+        print(' '.join(
+            f'{key}={value:.2f}' if isinstance(value, float)
+            else f'{key}={value}' for key, value in row.items()
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--titles', type=int, default=500)
+    parser.add_argument('--genres', type=int, default=20)
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--reviews', type=int, default=10,
+                        help='отзывов на произведение')
+    parser.add_argument('--comments', type=int, default=2,
+                        help='комментариев на отзыв')
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--cache', action='store_true')
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    args = parser.parse_args()
+    if args.titles < args.warmup + args.requests:
+        parser.error('--titles должно быть не меньше --warmup + --requests')
+    with test_database() as connection:
+        scale = seed(args.users, args.titles, args.genres, args.categories,
+                     args.reviews, args.comments)
+        results = run(scale, args.requests, args.warmup, args.cache)
+        vendor = connection.vendor
+    report = {'scale': scale, 'vendor': vendor, 'cache': args.cache,
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if not args.baseline:
+        print_rows({'endpoint': name, **result}
+                   for name, result in results.items())
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if (baseline['scale'], baseline['vendor']) != (scale, vendor):
+        print('warning=baseline-scale-or-database-differs')
+    rows, failed = compare(results, baseline['results'], args.tolerance,
+                           args.min_delta_ms)
+    print_rows(rows)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
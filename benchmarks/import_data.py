@@ -0,0 +1,99 @@
+"""import_data: разбор csv в основном процессе против пула процессов.
+
+Во временный каталог пишутся синтетические csv в формате static/data
+(--reviews отзывов, по комментарию на отзыв), затем для каждого значения
+--workers команда import_data загружает их в чистую временную базу.
+Время — вся команда вместе с rebuild_ratings, как у оператора.
+
+Пул ускоряет загрузку, только если у разбора строк есть свободные ядра,
+а запись (COPY на PostgreSQL) не успевает за ним; cpus в выводе — сколько
+ядер доступно процессу.
+
+    python -m benchmarks.import_data --reviews 200000 --workers 1,2,4
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.utils import test_database
+
+
+def write_csv(directory, name, header, rows):
+    with open(os.path.join(directory, name), 'w', encoding='utf-8',
+              newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def make_data(directory, reviews, users):
+    """csv с отзывом k произведения t от users[k]; число строк всего."""
+    titles = math.ceil(reviews / users)
+    write_csv(directory, 'users.csv',
+              ('id', 'username', 'email', 'role', 'bio', 'first_name',
+               'last_name'),
+              ((number, f'user{number}', f'user{number}@yamdb.fake',
+                'user', '', '', '') for number in range(1, users + 1)))
+    write_csv(directory, 'category.csv', ('id', 'name', 'slug'),
+              [(1, 'Фильм', 'movie')])
+    write_csv(directory, 'genre.csv', ('id', 'name', 'slug'),
+              [(1, 'Драма', 'drama'), (2, 'Комедия', 'comedy')])
+    write_csv(directory, 'titles.csv', ('id', 'name', 'year', 'category'),
+              ((number, f'Произведение {number}', 2000, 1)
+               for number in range(1, titles + 1)))
+    write_csv(directory, 'genre_title.csv', ('id', 'title_id', 'genre_id'),
+              ((number, number, number % 2 + 1)
+               for number in range(1, titles + 1)))
+    write_csv(directory, 'review.csv',
+              ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+              ((number + 1, number // users + 1, f'Отзыв, номер {number}',
+                number % users + 1, number % 10 + 1,
+                '2019-09-24T21:08:21.567Z') for number in range(reviews)))
+    write_csv(directory, 'comments.csv',
+              ('id', 'review_id', 'text', 'author', 'pub_date'),
+              ((number, number, f'Комментарий {number}',
+                number % users + 1, '2019-09-25T21:08:21.567Z')
+               for number in range(1, reviews + 1)))
+    return users + 1 + 2 + 2 * titles + 2 * reviews
+
+
+def run(directory, workers, batch_size):
+    from django.core.management import call_command
+
+    with test_database():
+        started = time.perf_counter()
+        call_command('import_data', '--data-dir', directory,
+                     '--batch-size', str(batch_size),
+                     '--workers', str(workers), stdout=io.StringIO())
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reviews', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', default='1,2,4')
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='yamdb-import-')
+    try:
+        rows = make_data(directory, args.reviews, args.users)
+        print(f'cpus={len(os.sched_getaffinity(0))} rows={rows} '
+              f'batch_size={args.batch_size}')
+        results = {}
+        for workers in map(int, args.workers.split(',')):
+            results[workers] = run(directory, workers, args.batch_size)
+            print(f'workers={workers} seconds={results[workers]:.2f} '
+                  f'rows_per_s={rows / results[workers]:.0f}')
+        print(f'fastest_workers={min(results, key=results.get)}')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
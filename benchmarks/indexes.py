@@ -0,0 +1,173 @@
+"""Индексы отзывов, комментариев и ролей: планы и время до и после 0016.
+
+Временная база мигрируется до reviews 0015, наполняется --reviews
+отзывами и столькими же комментариями, затем для каждой выборки
+снимаются план (QuerySet.explain) и время. После миграции 0016 замеры
+повторяются на тех же данных. Выборки — те, что делают ленты API и
+фильтры админки: по произведению, отзыву, автору и роли. Отдельно
+меряется вставка комментариев: за каждый индекс платит запись.
+
+Отзывов по умолчанию миллион; на SQLite в памяти это около 1 ГБ и
+несколько минут пересборки таблиц миграцией, для быстрой проверки
+хватит --reviews 100000.
+
+    python -m benchmarks.indexes --reviews 1000000
+"""
+import argparse
+import math
+from datetime import timedelta
+
+from benchmarks.utils import test_database, timeit
+
+BATCH_SIZE = 10000
+INSERTS = 5000
+COMMENT_SQL = (
+    'INSERT INTO reviews_comment (review_id, author_id, text, pub_date, '
+    'updated_at) VALUES (%s, %s, %s, %s, %s)'
+)
+
+
+def rows(count, make):
+    for start in range(0, count, BATCH_SIZE):
+        yield [make(number)
+               for number in range(start, min(start + BATCH_SIZE, count))]
+
+
+def seed(reviews, users):
+    """Отзыв k произведения t написал users[k]; у отзыва — комментарий.
+
+    Каждый десятый комментарий пишет users[0] (админ): у активного
+    автора строк больше, чем помещается в страницу админки.
+    """
+    from django.db import connection
+    from django.utils import timezone
+    from reviews.models import Title, User
+    from reviews.utils import ADMIN, MODERATOR, USER
+
+    titles = math.ceil(reviews / users)
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake',
+             role=(ADMIN if number % 1000 == 0 else
+                   MODERATOR if number % 100 == 0 else USER))
+        for number in range(users)
+    )
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000)
+        for number in range(titles)
+    )
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    title_ids = list(Title.objects.order_by('id').values_list('id',
+                                                              flat=True))
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        # Сотни тысяч строк моделями создавались бы дольше самих замеров.
+        for batch in rows(reviews, lambda number: (
+            title_ids[number // users], user_ids[number % users],
+            f'Отзыв {number}', number % 10 + 1,
+            now - timedelta(seconds=number), now,
+        )):
+            cursor.executemany(
+                'INSERT INTO reviews_review (title_id, author_id, text, '
+                'score, pub_date, updated_at) VALUES (%s, %s, %s, %s, %s, %s)',
+                batch,
+            )
+        cursor.execute('SELECT MIN(id) FROM reviews_review')
+        first_review = cursor.fetchone()[0]
+        for batch in rows(reviews, lambda number: (
+            first_review + number,
+            user_ids[0 if number % 10 == 0 else number * 7 % users],
+            f'Комментарий {number}', now - timedelta(seconds=number), now,
+        )):
+            cursor.executemany(COMMENT_SQL, batch)
+    return {'users': users, 'titles': titles, 'reviews': reviews,
+            'comments': reviews}
+
+
+def queries():
+    """Выборки лент API и фильтров админки: (имя, QuerySet)."""
+    from reviews.models import Comment, Review, User
+    from reviews.utils import ADMIN
+
+    review = Review.objects.order_by('id').values_list('id', flat=True)[0]
+    title, author = Review.objects.filter(id=review).values_list(
+        'title_id', 'author_id'
+    )[0]
+    return [
+        ('review-feed', Review.objects.filter(title_id=title)[:20]),
+        ('comment-feed', Comment.objects.filter(review_id=review)[:20]),
+        ('reviews-by-author', Review.objects.filter(author_id=author)[:100]),
+        ('comments-by-author',
+         Comment.objects.filter(author_id=author)[:100]),
+        ('users-by-role', User.objects.filter(role=ADMIN)),
+    ]
+
+
+def insert_comments():
+    """Вставка INSERTS комментариев с откатом: цена индексов на запись."""
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from reviews.models import Review
+
+    review, author = Review.objects.values_list('id', 'author_id')[0]
+    now = timezone.now()
+    batch = [(review, author, f'Вставка {number}', now, now)
+             for number in range(INSERTS)]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.executemany(COMMENT_SQL, batch)
+        transaction.set_rollback(True)
+
+
+def fetch(sql, params):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        cursor.fetchall()
+
+
+def measure(state, repeat):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    results = {}
+    for name, queryset in queries():
+        plan = ' | '.join(' '.join(line.split())
+                          for line in queryset.explain().splitlines())
+        # Меряется SQL без создания моделей: их цена от индексов не зависит.
+        sql, params = queryset.query.sql_with_params()
+        results[name] = timeit(lambda: fetch(sql, params), repeat)
+        print(f'query={name} state={state} ms={results[name]:.3f} '
+              f'plan={plan}')
+    results['insert-comments'] = timeit(insert_comments, repeat)
+    print(f'query=insert-comments state={state} rows={INSERTS} '
+          f'ms={results["insert-comments"]:.3f}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    from django.core.management import call_command
+
+    with test_database() as connection:
+        call_command('migrate', 'reviews', '0015', verbosity=0)
+        scale = seed(args.reviews, args.users)
+        print('vendor={} {}'.format(connection.vendor, ' '.join(
+            f'{key}={value}' for key, value in scale.items()
+        )))
+        before = measure('before', args.repeat)
+        call_command('migrate', 'reviews', '0016', verbosity=0)
+        after = measure('after', args.repeat)
+    for name in before:
+        print(f'query={name} before_ms={before[name]:.3f} '
+              f'after_ms={after[name]:.3f} '
+              f'speedup={before[name] / after[name]:.2f}')
+
+
+if __name__ == '__main__':
+    main()
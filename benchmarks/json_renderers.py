@@ -0,0 +1,94 @@
+"""CPU на запрос списков произведений и отзывов: JSONRenderer (stdlib
+json) против FastJSONRenderer (orjson).
+
+Меряется процессорное время (time.process_time) полного запроса через
+тестовый клиент и отдельно — только рендеринга response.data.
+
+    python -m benchmarks.json_renderers --limit 100 --requests 50
+"""
+import argparse
+import time
+
+from benchmarks.utils import test_database
+
+
+def seed(size):
+    from reviews.models import Category, Genre, Review, Title, User
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(3)
+    ]
+    titles = [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             description='Описание ' * 20, category=category)
+        for number in range(size)
+    ]
+    for title in titles:
+        title.genre.set(genres)
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+        for number in range(size)
+    )
+    for number, author in enumerate(User.objects.all()):
+        Review.objects.create(title=titles[0], author=author,
+                              text='Текст отзыва ' * 30,
+                              score=number % 10 + 1)
+    return titles[0]
+
+
+def cpu_ms(func, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - started) * 1000 / repeat
+
+
+def run(title, limit, repeat):
+    from api.renderers import FastJSONRenderer, orjson
+    from api.views import ReviewViewSet, TitleViewSet
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    urls = {
+        'titles': f'/api/v1/titles/?limit={limit}',
+        'reviews': f'/api/v1/titles/{title.id}/reviews/?limit={limit}',
+    }
+    results = []
+    with override_settings(API_CACHE_TIMEOUT=0):
+        for name, url in urls.items():
+            data = client.get(url).data
+            result = {'endpoint': name, 'orjson': orjson is not None}
+            for renderer in (JSONRenderer, FastJSONRenderer):
+                for viewset in (TitleViewSet, ReviewViewSet):
+                    viewset.renderer_classes = [renderer]
+                prefix = 'std' if renderer is JSONRenderer else 'fast'
+                result[f'{prefix}_request_ms'] = cpu_ms(
+                    lambda: client.get(url), repeat
+                )
+                result[f'{prefix}_render_ms'] = cpu_ms(
+                    lambda: renderer().render(data), repeat
+                )
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    with test_database():
+        title = seed(args.limit)
+        for result in run(title, args.limit, args.requests):
+            print(' '.join(
+                f'{key}={value:.2f}' if isinstance(value, float)
+                else f'{key}={value}' for key, value in result.items()
+            ))
+
+
+if __name__ == '__main__':
+    main()
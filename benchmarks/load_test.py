@@ -0,0 +1,217 @@
+"""Нагрузочный тест режимов запуска: запросов в секунду и задержки.
+
+Для каждого режима поднимается gunicorn с api_yamdb/gunicorn.conf.py на
+свободном порту, после прогрева клиенты в --concurrency потоках по
+кругу запрашивают списки каталога и отзывов. Кэш ответов и ограничение
+частоты на время теста выключены: меряется сервер вместе с БД.
+
+По умолчанию сервер работает с временной SQLite-базой, которую скрипт
+создаёт и наполняет сам. --env-db берёт базу из переменных окружения
+(DB_ENGINE, DB_NAME, ...), например локальный PostgreSQL, — она должна
+быть заранее смигрирована и наполнена. Клиент на Python сам расходует
+CPU, поэтому цифры годятся для сравнения режимов, а не как потолок.
+
+    python -m benchmarks.load_test --modes sync,gthread --duration 10
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(ROOT_DIR, 'api_yamdb')
+WSGI_APP = 'api_yamdb.wsgi:application'
+ASGI_APP = 'api_yamdb.asgi:application'
+
+# Режим: (приложение, переменные окружения сервера).
+MODES = {
+    'sync': (WSGI_APP, {
+        'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_THREADS': '1',
+        'DB_CONN_MAX_AGE': '0',
+    }),
+    'sync-persistent': (WSGI_APP, {
+        'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_THREADS': '1',
+        'DB_CONN_MAX_AGE': '60',
+    }),
+    'gthread': (WSGI_APP, {
+        'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': '4',
+        'DB_CONN_MAX_AGE': '60',
+    }),
+    'asgi': (ASGI_APP, {
+        'GUNICORN_WORKER_CLASS': 'uvicorn.workers.UvicornWorker',
+        'DB_CONN_MAX_AGE': '60',
+    }),
+}
+SERVER_ENV = {
+    'API_CACHE_TIMEOUT': '0',
+    'THROTTLE_AUTH_RATE': '1000000/s',
+    'THROTTLE_CATALOG_RATE': '1000000/s',
+    'THROTTLE_API_RATE': '1000000/s',
+}
+
+
+def prepare_database(size):
+    """Временная SQLite-база с миграциями и данными; путь к каталогу."""
+    directory = tempfile.mkdtemp(prefix='yamdb-load-')
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = os.path.join(directory, 'db.sqlite3')
+    # Импорт benchmarks настраивает Django — уже с временной базой.
+    from django.core.management import call_command
+
+    from benchmarks.json_renderers import seed
+
+    call_command('migrate', verbosity=0)
+    seed(size)
+    return directory
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get(connection, url):
+    connection.request('GET', url)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def wait_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn завершился при запуске')
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        try:
+            if get(connection, '/api/v1/genres/') == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            connection.close()
+    raise RuntimeError('gunicorn не ответил за {} с'.format(timeout))
+
+
+def catalog_urls(port):
+    """Списки для нагрузки; отзывы — первого произведения в базе."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request('GET', '/api/v1/titles/?limit=1&count=none')
+    results = json.loads(connection.getresponse().read())['results']
+    connection.close()
+    urls = ['/api/v1/titles/?limit=20', '/api/v1/genres/']
+    if results:
+        urls.append(f'/api/v1/titles/{results[0]["id"]}/reviews/')
+    return urls
+
+
+def load(port, urls, concurrency, duration):
+    """Запросы в concurrency потоках; (задержки в мс, число ошибок)."""
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, failed, number = [], 0, offset
+        while time.monotonic() < deadline:
+            url = urls[number % len(urls)]
+            number += 1
+            started = time.perf_counter()
+            try:
+                status = get(connection, url)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                failed += 1
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+            failed += status != 200
+        connection.close()
+        latencies.extend(local)
+        errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(number,))
+               for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), sum(errors)
+
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run_mode(name, args):
+    app, mode_env = MODES[name]
+    port = free_port()
+    env = dict(os.environ, **SERVER_ENV, **mode_env,
+               GUNICORN_BIND=f'127.0.0.1:{port}')
+    if args.workers:
+        env['GUNICORN_WORKERS'] = str(args.workers)
+    process = subprocess.Popen(
+        # python -m gunicorn работает только с gunicorn 20.1+.
+        [sys.executable, '-m', 'gunicorn.app.wsgiapp',
+         '--config', 'gunicorn.conf.py', app],
+        cwd=PROJECT_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port, process)
+        urls = catalog_urls(port)
+        load(port, urls, args.concurrency, args.warmup)
+        latencies, errors = load(port, urls, args.concurrency,
+                                 args.duration)
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        'mode': name,
+        'requests': len(latencies),
+        'rps': len(latencies) / args.duration,
+        'p50_ms': percentile(latencies, 0.5),
+        'p99_ms': percentile(latencies, 0.99),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modes', default='sync,sync-persistent,gthread,asgi')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='0 — как в gunicorn.conf.py (2 * CPU + 1)')
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--env-db', action='store_true')
+    args = parser.parse_args()
+    modes = args.modes.split(',')
+    if 'asgi' in modes and importlib.util.find_spec('uvicorn') is None:
+        print('mode=asgi skipped=uvicorn-not-installed')
+        modes.remove('asgi')
+    directory = None if args.env_db else prepare_database(args.size)
+    try:
+        for name in modes:
+            result = run_mode(name, args)
+            print(' '.join(
+                f'{key}={value:.2f}' if isinstance(value, float)
+                else f'{key}={value}' for key, value in result.items()
+            ))
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""CPU на запрос списков: ModelSerializer против облегчённых
+read-сериализаторов (values() и словари).
+
+Для каждого эндпоинта меряется процессорное время полного запроса
+через тестовый клиент и отдельно — только сериализации страницы.
+
+    python -m benchmarks.read_serializers --limit 100 --requests 50
+"""
+import argparse
+
+from benchmarks.json_renderers import cpu_ms
+from benchmarks.utils import test_database
+
+
+def seed(size):
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(3)
+    ]
+    titles = [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             description='Описание ' * 20, category=category)
+        for number in range(size)
+    ]
+    for title in titles:
+        title.genre.set(genres)
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+        for number in range(size)
+    )
+    authors = list(User.objects.all())
+    for number, author in enumerate(authors):
+        Review.objects.create(title=titles[0], author=author,
+                              text='Текст отзыва ' * 30,
+                              score=number % 10 + 1)
+    review = Review.objects.first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий ' * 10)
+        for author in authors
+    )
+    return review
+
+
+def run(review, limit, repeat):
+    from api import serializers, views
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    title_id = review.title_id
+    endpoints = [
+        ('titles', views.TitleViewSet, serializers.TitleSerializer,
+         f'/api/v1/titles/?limit={limit}'),
+        ('reviews', views.ReviewViewSet, serializers.ReviewSerializer,
+         f'/api/v1/titles/{title_id}/reviews/?limit={limit}'),
+        ('comments', views.CommentViewSet, serializers.CommentSerializer,
+         f'/api/v1/titles/{title_id}/reviews/{review.id}/comments/'
+         f'?limit={limit}'),
+    ]
+    results = []
+    with override_settings(API_CACHE_TIMEOUT=0):
+        for name, viewset, full_class, url in endpoints:
+            read_class = viewset.read_serializer_class
+            queryset = viewset(
+                kwargs={'title_id': title_id, 'review_id': review.id},
+                request=None, format_kwarg=None,
+            ).get_queryset()[:limit]
+            rows = list(read_class.get_queryset(queryset))
+            objects = list(queryset)
+            result = {'endpoint': name}
+            viewset.read_serializer_class = None
+            result['full_request_ms'] = cpu_ms(lambda: client.get(url),
+                                               repeat)
+            result['full_serialize_ms'] = cpu_ms(
+                lambda: full_class(objects, many=True).data, repeat
+            )
+            viewset.read_serializer_class = read_class
+            result['read_request_ms'] = cpu_ms(lambda: client.get(url),
+                                               repeat)
+            result['read_serialize_ms'] = cpu_ms(
+                lambda: read_class(rows).data, repeat
+            )
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    with test_database():
+        review = seed(args.limit)
+        for result in run(review, args.limit, args.requests):
+            print(' '.join(
+                f'{key}={value:.2f}' if isinstance(value, float)
+                else f'{key}={value}' for key, value in result.items()
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Пиковая память на выдачу списка произведений: JSONRenderer против
+потоковой выдачи (?stream=true, api.streaming).
+
+Память меряется tracemalloc (пик выделений Python за вызов), тело ответа
+потоковой выдачи читается и сразу отбрасывается, как это делает сервер.
+
+    python -m benchmarks.streaming_memory --sizes 1000 10000 50000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.utils import test_database
+
+
+def seed(size, batch_size=5000):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(5)
+    ]
+    through = Title.genre.through
+    for start in range(0, size, batch_size):
+        titles = Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000,
+                  description='Описание ' * 20, category=category)
+            for number in range(start, min(start + batch_size, size))
+        )
+        if not titles[0].pk:
+            titles = Title.objects.order_by('-id')[:len(titles)]
+        through.objects.bulk_create(
+            through(title_id=title.pk, genre_id=genre.pk)
+            for title in titles for genre in genres[:2]
+        )
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak / 2 ** 20
+
+
+def run(size, chunk_size):
+    from api.serializers import TitleSerializer
+    from api.streaming import stream_json
+    from api.views import TitleViewSet
+    from rest_framework.renderers import JSONRenderer
+
+    queryset = TitleViewSet.queryset.order_by('id')
+
+    def rendered():
+        data = TitleSerializer(queryset.all(), many=True).data
+        return len(JSONRenderer().render(data))
+
+    def streamed():
+        return sum(len(part) for part in stream_json(
+            queryset.all(),
+            lambda objects: TitleSerializer(objects, many=True),
+            chunk_size,
+        ))
+
+    render_bytes, render_ms, render_mb = measure(rendered)
+    stream_bytes, stream_ms, stream_mb = measure(streamed)
+    return {
+        'size': size,
+        'body_mb': render_bytes / 2 ** 20,
+        'render_peak_mb': render_mb,
+        'render_ms': render_ms,
+        'stream_peak_mb': stream_mb,
+        'stream_ms': stream_ms,
+        'stream_body_mb': stream_bytes / 2 ** 20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000])
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+    for size in args.sizes:
+        with test_database():
+            seed(size)
+            result = run(size, args.chunk_size)
+            print(' '.join(
+                f'{key}={value:.1f}' if isinstance(value, float)
+                else f'{key}={value}' for key, value in result.items()
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Поиск произведений: ?search= против прежнего ?name= (LIKE '%x%').
+
+    python -m benchmarks.title_search --sizes 100000 1000000
+"""
+import argparse
+import random
+
+from benchmarks.utils import test_database, timeit
+
+WORDS = (
+    'война мир дон запад море небо город ночь день звезда лес река '
+    'огонь ветер песня дорога время жизнь смерть любовь'
+).split()
+
+
+def seed(size, batch_size=10000):
+    from reviews.models import Title
+
+    rng = random.Random(size)
+    for start in range(0, size, batch_size):
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(rng.choices(WORDS, k=3)) + f' {number}',
+                description=' '.join(rng.choices(WORDS, k=12)),
+                year=1900 + number % 120,
+            )
+            for number in range(start, min(start + batch_size, size))
+        )
+
+
+def run(size, query):
+    from api.filters import TitleFilter
+    from django.test import override_settings
+    from rest_framework.exceptions import ValidationError
+    from reviews.models import Title
+    from reviews.search import title_index
+
+    def fetch(params):
+        queryset = TitleFilter(params, Title.objects.all()).qs
+        return list(queryset[:100].values_list('id', flat=True))
+
+    title_index.reset()
+    result = {
+        'size': size,
+        'query': query,
+        'contains_ms': timeit(lambda: fetch({'name': query})),
+    }
+    # Бенчмарк однопроцессный: запасной индекс вне PostgreSQL уместен.
+    with override_settings(SEARCH_FALLBACK_ENABLED=True):
+        try:
+            result['search_first_ms'] = timeit(
+                lambda: fetch({'search': query}), 1
+            )
+            result['search_ms'] = timeit(lambda: fetch({'search': query}))
+        except ValidationError:
+            # Запасной индекс отклоняет запросы шире FALLBACK_LIMIT.
+            result['search_ms'] = 'rejected'
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100000, 1000000])
+    # Частое слово (LIKE останавливается на первой сотне совпадений)
+    # и редкое (LIKE читает всю таблицу).
+    parser.add_argument('--queries', nargs='+', default=['звезда', '54321'])
+    args = parser.parse_args()
+    for size in args.sizes:
+        with test_database() as connection:
+            seed(size)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE reviews_title')
+            for query in args.queries:
+                result = run(size, query)
+                print(' '.join(
+                    f'{key}={value:.1f}' if isinstance(value, float)
+                    else f'{key}={value}' for key, value in result.items()
+                ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Запросы и время на PATCH профиля: прежние count()-валидаторы против
+одной проверки уникальности.
+
+Прежний UserSerializer делал по COUNT(*) на email и на username и
+возвращал из валидаторов None (значения терялись); новый проверяет оба
+поля одним запросом.
+
+    python -m benchmarks.user_patch --users 10000 --patches 500
+"""
+import argparse
+
+from benchmarks.utils import test_database, timeit
+
+
+def legacy_serializer_class():
+    from api.serializers import UserSerializer
+    from rest_framework.exceptions import ValidationError
+    from reviews.models import User
+
+    class LegacyUserSerializer(UserSerializer):
+        def validate(self, data):
+            return data
+
+        def validate_email(self, email):
+            if (self.instance.email != email
+                    and User.objects.filter(email=email).count() > 0):
+                raise ValidationError('exists')
+            return email
+
+        def validate_username(self, username):
+            if (self.instance.username != username
+                    and User.objects.filter(username=username).count() > 0):
+                raise ValidationError('exists')
+            return username
+
+        def update(self, instance, validated_data):
+            return super(UserSerializer, self).update(
+                instance, validated_data
+            )
+
+    return LegacyUserSerializer
+
+
+def seed(size, batch_size=5000):
+    from reviews.models import User
+
+    for start in range(0, size, batch_size):
+        User.objects.bulk_create(
+            User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+            for number in range(start, min(start + batch_size, size))
+        )
+
+
+def run(users, patches):
+    from api.serializers import UserSerializer
+    from django.db import connection
+    from django.test import RequestFactory
+    from reviews.models import User
+
+    request = RequestFactory().patch('/api/v1/users/me/')
+    request.user = User.objects.get(username='user0')
+    targets = list(User.objects.order_by('id')[:patches])
+
+    def patch(serializer_class, suffix):
+        def func():
+            for user in targets:
+                serializer = serializer_class(
+                    user, partial=True, context={'request': request},
+                    data={'email': f'{user.pk}-{suffix}@yamdb.fake',
+                          'username': f'{user.pk}-{suffix}'},
+                )
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+        return func
+
+    def count_queries(func):
+        connection.force_debug_cursor = True
+        connection.queries_log.clear()
+        func()
+        connection.force_debug_cursor = False
+        return sum(
+            not query['sql'].startswith(('BEGIN', 'SAVEPOINT', 'RELEASE'))
+            for query in connection.queries_log
+        ) / patches
+
+    legacy = legacy_serializer_class()
+    return {
+        'users': users,
+        'patches': patches,
+        'legacy_queries': count_queries(patch(legacy, 'q1')),
+        'legacy_ms': timeit(patch(legacy, 'a'), 1),
+        'single_queries': count_queries(patch(UserSerializer, 'q2')),
+        'single_ms': timeit(patch(UserSerializer, 'b'), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, nargs='+', default=[10000])
+    parser.add_argument('--patches', type=int, default=500)
+    args = parser.parse_args()
+    for users in args.users:
+        with test_database():
+            seed(users)
+            result = run(users, args.patches)
+            print(' '.join(
+                f'{key}={value:.1f}' if isinstance(value, float)
+                else f'{key}={value}' for key, value in result.items()
+            ))
+
+
+if __name__ == '__main__':
+    main()
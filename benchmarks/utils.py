@@ -0,0 +1,48 @@
+"""Общее для бенчмарков: настройка Django и временная тестовая БД.
+
+Бенчмарки никогда не пишут в рабочую базу: create_test_db() создаёт
+отдельную test_<NAME> (для SQLite — в памяти) и удаляет её по выходу.
+"""
+import contextlib
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield connection
+    finally:
+        if connection.vendor == 'sqlite':
+            # In-memory база SQLite не закрывается вместе с соединением,
+            # и без очистки данные попали бы в следующий test_database().
+            call_command('flush', interactive=False, verbosity=0)
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timeit(func, repeat=5):
+    """Лучшее из repeat время вызова func в миллисекундах."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -0,0 +1,97 @@
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUserAnother', email='another@yamdb.fake',
+        password='1234567'
+    )
+
+
+@pytest.fixture
+def title():
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Титаник', year=1997, category=category)
+    title.genre.add(genre)
+    return title
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='admin@yamdb.fake', password='1234567',
+        role='admin'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    """Несколько произведений с жанрами, отзывами и комментариями."""
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        for i in range(3)
+    ]
+    titles = []
+    for i, category in enumerate(categories):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category
+        )
+        title.genre.set(genres[:i + 1])
+        titles.append(title)
+    title = titles[0]
+    for score, author in enumerate(authors, start=5):
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score
+        )
+        for commenter in authors:
+            Comment.objects.create(
+                review=review, author=commenter, text='Комментарий'
+            )
+    return title
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api import metrics
+    from api.authentication import claims_cache
+    from api.throttling import reset_store
+    from django.core.cache import cache
+    from reviews.search import title_index
+
+    cache.clear()
+    claims_cache.clear()
+    reset_store()
+    metrics.reset_store()
+    title_index.reset()
@@ -0,0 +1,139 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    url = '/api/v1/auth/token/'
+
+    def test_code_is_exchanged_for_token_in_one_query(
+            self, client, user, django_assert_num_queries):
+        from reviews.confirmation import make_code
+
+        code = make_code(user)
+        with django_assert_num_queries(1):
+            response = client.post(self.url, {
+                'username': user.username, 'confirmation_code': code,
+            })
+        assert response.status_code == 200, (
+            'Проверьте, что верный код обменивается на токен'
+        )
+        assert 'token' in response.json()
+
+    def test_invalid_codes_are_rejected(self, client, user, another_user):
+        from reviews.confirmation import make_code
+
+        for code in ('wrong', make_code(another_user)):
+            response = client.post(self.url, {
+                'username': user.username, 'confirmation_code': code,
+            })
+            assert response.status_code == 400, (
+                'Проверьте, что чужой или неверный код отклоняется'
+            )
+        response = client.post(self.url, {
+            'username': 'nobody', 'confirmation_code': make_code(user),
+        })
+        assert response.status_code == 404
+
+    def test_expired_and_revoked_codes_are_rejected(
+            self, client, user, settings):
+        from reviews.confirmation import check_code, make_code, make_nonce
+
+        code = make_code(user)
+        settings.CONFIRMATION_CODE_MAX_AGE = -1
+        response = client.post(self.url, {
+            'username': user.username, 'confirmation_code': code,
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что истёкший код отклоняется'
+        )
+        settings.CONFIRMATION_CODE_MAX_AGE = 60
+        assert check_code(user, code)
+        user.confirmation_nonce = make_nonce()
+        assert not check_code(user, code), (
+            'Проверьте, что смена nonce отзывает выданные коды'
+        )
+
+
+    def test_signup_again_reissues_code(self, client):
+        from reviews.confirmation import check_code
+        from reviews.models import OutgoingEmail, User
+
+        pair = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        for _ in range(2):
+            response = client.post('/api/v1/auth/signup/', pair)
+            assert response.status_code == 200, (
+                'Проверьте, что повторная регистрация той же парой '
+                'выдаёт новый код'
+            )
+        user = User.objects.get()
+        first, second = OutgoingEmail.objects.values_list('message',
+                                                          flat=True)
+        assert check_code(user, second)
+        assert not check_code(user, first), (
+            'Проверьте, что новый код отзывает прежний'
+        )
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'newbie', 'email': 'other@yamdb.fake',
+        })
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    @staticmethod
+    def make_client(user):
+        from api.authentication import get_access_token
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}'
+        )
+        return client
+
+    def test_user_is_built_from_token_claims(
+            self, user, title, django_assert_num_queries):
+        client = self.make_client(user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        client.get(url)
+        # Проверка claims закэширована, пользователь из БД не читается.
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/users/')
+        assert response.status_code == 403
+        response = client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+
+    def test_rename_keeps_token(self, user):
+        client = self.make_client(user)
+        response = client.patch('/api/v1/users/me/', {'username': 'renamed'})
+        assert response.status_code == 200
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что смена username не отзывает токен'
+        )
+        assert response.json()['username'] == 'renamed'
+
+    def test_role_change_revokes_token_claims(self, user, admin):
+        from api.authentication import claims_cache
+
+        admin_client = self.make_client(admin)
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен с устаревшей ролью отклоняется'
+        )
+        assert self.make_client(admin).get(
+            '/api/v1/users/'
+        ).status_code == 403
+
+        claims_cache.clear()
+        user_client = self.make_client(user)
+        user_client.get('/api/v1/users/me/')
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
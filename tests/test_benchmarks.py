@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestEndpointsBenchmark:
+
+    def test_every_route_is_covered(self):
+        from api.urls import router
+        from api.views import TokenObtainViewset
+        from benchmarks.endpoints import run, scenarios, seed
+        from django.urls import resolve
+
+        scale = seed(users=6, titles=4, genres=3, categories=2, reviews=2,
+                     comments=1)
+        covered = {
+            resolve(request(0)[0].partition('?')[0]).func.cls
+            for name, method, request, token, status in scenarios(scale)
+        }
+        views = {viewset for prefix, viewset, basename in router.registry}
+        assert views | {TokenObtainViewset} <= covered, (
+            'Проверьте, что бенчмарк вызывает каждый маршрут api/urls.py'
+        )
+        results = run(scale, requests=2, warmup=1)
+        assert all(result['queries'] >= 1 for result in results.values())
+
+    def test_compare_detects_regressions(self):
+        from benchmarks.endpoints import compare
+
+        baseline = {
+            'list': {'p50_ms': 10.0, 'queries': 3},
+            'detail': {'p50_ms': 2.0, 'queries': 1},
+        }
+        rows, failed = compare({
+            'list': {'p50_ms': 10.5, 'queries': 3},
+            'detail': {'p50_ms': 2.6, 'queries': 1},
+            'stats': {'p50_ms': 1.0, 'queries': 1},
+        }, baseline, tolerance=0.2)
+        assert not failed, (
+            'Проверьте, что шум меньше --min-delta-ms не считается регрессией'
+        )
+        assert [row['status'] for row in rows] == ['ok', 'ok', 'new']
+        rows, failed = compare({
+            'list': {'p50_ms': 13.0, 'queries': 4},
+            'detail': {'p50_ms': 2.0, 'queries': 1},
+        }, baseline, tolerance=0.2)
+        assert failed
+        assert rows[0]['status'] == 'queries,latency'
@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+
+    @pytest.fixture(autouse=True)
+    def response_cache(self, settings):
+        from api import cache
+
+        # В тестах один процесс: кэш в памяти процесса корректен.
+        settings.API_CACHE_TIMEOUT = 300
+        cache.reset_counters()
+
+    def test_repeated_get_is_served_from_cache(
+            self, client, catalog, django_assert_num_queries):
+        from api import cache
+
+        first = client.get('/api/v1/titles/', {'limit': 2})
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/', {'limit': 2})
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET отдаётся из кэша без запросов к БД'
+        )
+        assert second.json() == first.json()
+        other = client.get('/api/v1/titles/', {'limit': 1})
+        assert other['X-Cache'] == 'MISS', (
+            'Проверьте, что строка запроса входит в ключ кэша'
+        )
+        assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3}
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/',
+    ])
+    def test_writes_invalidate_cache(self, client, catalog, user, url):
+        from reviews.models import Genre, Review
+
+        client.get(url)
+        Genre.objects.create(name='Комедия', slug='comedy')
+        assert client.get(url)['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение каталога сбрасывает кэш'
+        )
+        client.get(url)
+        Review.objects.create(title=catalog, author=user, text='1', score=1)
+        assert client.get(url)['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш (меняется рейтинг)'
+        )
+
+    def test_host_is_not_in_key(self, client, catalog, settings):
+        settings.ALLOWED_HOSTS = ['*']
+        client.get('/api/v1/genres/', HTTP_HOST='yamdb.fake')
+        response = client.get('/api/v1/genres/', HTTP_HOST='127.0.0.1')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что Host не входит в ключ кэша'
+        )
+
+    def test_import_data_invalidates(self, client, catalog, tmp_path):
+        url = '/api/v1/genres/'
+        client.get(url)
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n100,Комедия,comedy\n', encoding='utf-8'
+        )
+        call_command('import_data', '--data-dir', str(tmp_path))
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что import_data сбрасывает кэш каталога'
+        )
+        assert 'comedy' in [genre['slug']
+                            for genre in response.json()['results']]
+
+    def test_cache_stats_reads_worker_snapshots(self, client, catalog,
+                                                settings, tmp_path, capsys):
+        from api import metrics
+
+        settings.API_METRICS_DIR = str(tmp_path)
+        metrics.reset_store()
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        metrics.get_store().flush()
+        call_command('cache_stats')
+        assert 'hits=1 misses=1 hit_ratio=0.500' in capsys.readouterr().out
+        metrics.reset_store()
+
+    def test_title_genres_change_invalidates(self, client, catalog):
+        from reviews.models import Genre
+
+        url = f'/api/v1/titles/{catalog.id}/'
+        client.get(url)
+        catalog.genre.add(Genre.objects.last())
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.json()['genre']) == 2
+
+
+def test_process_local_cache_is_not_used(settings):
+    assert settings.CACHES['default']['BACKEND'] in (
+        settings.PROCESS_LOCAL_CACHE_BACKENDS
+    )
+    assert settings.API_CACHE_TIMEOUT == 0, (
+        'Проверьте, что кэш ответов выключен на кэше в памяти процесса'
+    )
+    with pytest.raises(CommandError):
+        call_command('cache_stats')
@@ -0,0 +1,148 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_etag_not_modified(self, client, catalog,
+                               django_assert_num_queries):
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag.startswith('"'), 'Проверьте, что список отдаёт ETag'
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что совпавший If-None-Match возвращает 304 без '
+            'сериализации'
+        )
+        assert response['ETag'] == etag
+
+    def test_etag_changes_on_write(self, client, catalog, user):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        etag = client.get(url)['ETag']
+        review = Review.objects.create(
+            title=catalog, author=user, text='Новый', score=1
+        )
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        etag = client.get(url)['ETag']
+        review.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что удаление меняет ETag списка'
+        )
+
+    def test_last_modified_on_detail(self, client, catalog):
+        url = f'/api/v1/titles/{catalog.id}/'
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            'Проверьте, что If-Modified-Since возвращает 304 для объекта'
+        )
+
+    def test_feed_etag_follows_author_rename(self, client, catalog):
+        review = catalog.reviews.first()
+        urls = (f'/api/v1/titles/{catalog.id}/reviews/',
+                f'/api/v1/titles/{catalog.id}/reviews/{review.id}/',
+                f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/')
+        etags = [client.get(url)['ETag'] for url in urls]
+        author = review.author
+        author.username = 'renamed'
+        author.save()
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что переименование автора меняет ETag ленты'
+            )
+
+    def test_title_etag_follows_genre_rename(self, client, catalog):
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        genre = catalog.genre.first()
+        genre.name = 'Новое имя'
+        genre.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что переименование жанра меняет ETag произведений'
+        )
+
+
+    def test_list_version_runs_no_count(self, client, catalog):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        urls = ('/api/v1/titles/?count=none',
+                f'/api/v1/titles/{catalog.id}/reviews/?pagination=cursor')
+        for url in urls:
+            etag = client.get(url)['ETag']
+            with CaptureQueriesContext(connection) as queries:
+                assert client.get(url).status_code == 200
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304
+            sql = ' '.join(
+                query['sql'] for query in queries.captured_queries
+            ).upper()
+            assert 'COUNT(' not in sql, (
+                'Проверьте, что версия списка не считает выборку'
+            )
+
+    def test_feed_etag_ignores_other_parents(self, client, catalog, user):
+        from reviews.models import Comment, Review, Title
+
+        other_title = Title.objects.exclude(pk=catalog.pk).first()
+        review, other_review = catalog.reviews.all()[:2]
+        urls = (f'/api/v1/titles/{catalog.id}/reviews/',
+                f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/')
+        etags = [client.get(url)['ETag'] for url in urls]
+        Review.objects.create(
+            title=other_title, author=user, text='Чужой', score=3
+        )
+        Comment.objects.create(review=other_review, author=user, text='Ещё')
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                'Проверьте, что запись в чужую ленту не меняет ETag ленты'
+            )
+        Comment.objects.create(review=review, author=user, text='Свой')
+        response = client.get(urls[1], HTTP_IF_NONE_MATCH=etags[1])
+        assert response.status_code == 200, (
+            'Проверьте, что комментарий меняет ETag ленты своего отзыва'
+        )
+
+    def test_title_etag_follows_rebuild_ratings(self, client, catalog):
+        from django.core.management import call_command
+        from reviews.models import Review
+
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        Review.objects.update(score=1)
+        call_command('rebuild_ratings')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что rebuild_ratings меняет ETag произведений'
+        )
+
+@pytest.mark.django_db
+def test_updated_at_is_not_exposed(client, catalog):
+    title = client.get(f'/api/v1/titles/{catalog.id}/').json()
+    genres = client.get('/api/v1/genres/').json()['results']
+    assert set(title['category']) == {'name', 'slug'}
+    assert all(set(genre) == {'name', 'slug'}
+               for genre in genres + title['genre']), (
+        'Проверьте, что служебное поле updated_at не попадает в ответы API'
+    )
+
+
+@pytest.mark.django_db
+def test_title_write_fields(admin_client, catalog):
+    response = admin_client.post('/api/v1/titles/', {
+        'name': 'Новое', 'year': 2001, 'genre': ['genre-0'],
+        'category': 'category-0',
+    })
+    assert response.status_code == 201
+    assert set(response.json()) == {
+        'id', 'name', 'year', 'description', 'genre', 'category',
+    }, 'Проверьте, что ответ на запись не раскрывает служебные поля'
+
@@ -0,0 +1,42 @@
+import pytest
+
+
+def names(client, **params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def test_slug_exact_by_default(self, client, catalog):
+        assert names(client, category='category-1') == ['Произведение 1']
+        assert names(client, category='category') == [], (
+            'Проверьте, что category по умолчанию сравнивается точно'
+        )
+
+    def test_slug_prefix_mode(self, client, catalog):
+        assert names(client, category='category', slug_match='prefix') == [
+            'Произведение 0', 'Произведение 1', 'Произведение 2'
+        ]
+
+    def test_slug_trigram_mode(self, client, catalog):
+        assert names(client, genre='genre-2', slug_match='trigram')
+
+    def test_unknown_mode_rejected(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'slug_match': 'regex'})
+        assert response.status_code == 400
+
+    def test_genre_filter_does_not_duplicate(self, client, catalog):
+        response = client.get(
+            '/api/v1/titles/', {'genre': 'genre-', 'slug_match': 'prefix'}
+        )
+        data = response.json()
+        assert data['count'] == 3 and len(data['results']) == 3, (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'возвращается один раз'
+        )
+        assert names(client, genre='genre-1') == [
+            'Произведение 1', 'Произведение 2'
+        ]
@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+CSV_FILES = {
+    'users.csv': 'id,username,email,role,bio,first_name,last_name\n'
+                 '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+                 '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n',
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': 'id,name,year,category\n1,Побег из Шоушенка,1994,1\n',
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,1,2\n',
+    'review.csv': 'id,title_id,text,author,score,pub_date\n'
+                  '1,1,"Ну, такое",100,10,2019-09-24T21:08:21.567Z\n'
+                  '2,1,Отлично,101,5,2019-09-25T21:08:21.567Z\n',
+    'comments.csv': 'id,review_id,text,author,pub_date\n'
+                    '1,1,Согласен,101,2019-09-26T21:08:21.567Z\n',
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in CSV_FILES.items():
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportData:
+
+    @pytest.mark.parametrize('workers', ['1', '2'])
+    def test_import_data(self, data_dir, workers):
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_data', '--data-dir', str(data_dir),
+                     '--batch-size', '1', '--workers', workers)
+        title = Title.objects.get(pk=1)
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }, 'Проверьте, что связи произведений с жанрами загружаются'
+        assert title.rating == 7, (
+            'Проверьте, что после загрузки отзывов пересчитан рейтинг'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.text == 'Ну, такое'
+        assert review.pub_date.isoformat() == '2019-09-24T21:08:21.567000+00:00', (
+            'Проверьте, что дата отзыва берётся из csv'
+        )
+        assert Comment.objects.get(pk=1).author.username == 'capt_obvious'
+
+    @pytest.mark.parametrize('workers', ['1', '2'])
+    def test_error_reports_file_and_line(self, data_dir, workers):
+        (data_dir / 'titles.csv').write_text(
+            'id,name,year,category\n1,Ок,1994,1\n2,Плохой год,год,1\n',
+            encoding='utf-8'
+        )
+        with pytest.raises(CommandError, match=r'titles\.csv:3:'):
+            call_command('import_data', '--data-dir', str(data_dir),
+                         '--batch-size', '1', '--workers', workers)
+
+    def test_score_out_of_range(self, data_dir):
+        from reviews.models import Review
+
+        (data_dir / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Ок,100,10,2019-09-24T21:08:21.567Z\n'
+            '2,1,Слишком,101,11,2019-09-25T21:08:21.567Z\n',
+            encoding='utf-8'
+        )
+        with pytest.raises(CommandError, match=r'review\.csv:3:'):
+            call_command('import_data', '--data-dir', str(data_dir))
+        assert not Review.objects.exists(), (
+            'Проверьте, что оценка вне 1..10 отклоняется при загрузке'
+        )
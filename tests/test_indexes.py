@@ -0,0 +1,81 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+
+def test_redundant_indexes():
+    from reviews.indexes import IndexInfo, redundant
+
+    found = redundant({
+        'pk': IndexInfo(('id',), True, 'btree'),
+        'author_fk': IndexInfo(('author_id',), False, 'btree'),
+        'unique_review': IndexInfo(('author_id', 'title_id'), True, 'btree'),
+        'title_fk': IndexInfo(('title_id',), False, 'btree'),
+        'title_trgm': IndexInfo(('title_id',), False, 'gin'),
+        'feed': IndexInfo(('title_id', 'pub_date'), False, 'btree'),
+        'feed_copy': IndexInfo(('title_id', 'pub_date'), False, 'btree'),
+    })
+    assert found == [
+        ('author_fk', 'unique_review'),
+        ('feed_copy', 'feed'),
+        ('title_fk', 'feed'),
+    ], 'Проверьте, что лишними считаются только индексы-префиксы того же типа'
+
+
+def test_pattern_ops_index_is_not_redundant(monkeypatch):
+    from django.db import connection
+    from reviews import indexes
+
+    def constraint(columns, unique=False, primary_key=False, index=True,
+                   kind='idx'):
+        return {'columns': columns, 'unique': unique, 'index': index,
+                'primary_key': primary_key, 'type': kind}
+
+    # Так get_constraints Django 2.2 видит уникальный slug на PostgreSQL.
+    monkeypatch.setattr(
+        connection.introspection, 'get_constraints',
+        lambda cursor, table: {
+            'reviews_genre_pkey': constraint(['id'], True, True, False,
+                                             None),
+            'reviews_genre_slug_key': constraint(['slug'], True, False,
+                                                 False, None),
+            'reviews_genre_slug_4b3c9a1f_like': constraint(['slug']),
+        }
+    )
+    monkeypatch.setattr(
+        indexes, 'custom_opclasses',
+        lambda cursor, table: {
+            'reviews_genre_slug_4b3c9a1f_like': ['varchar_pattern_ops'],
+        }
+    )
+    found = indexes.table_indexes(None, 'reviews_genre')
+    assert found['reviews_genre_slug_4b3c9a1f_like'].kind == (
+        'btree:varchar_pattern_ops'
+    )
+    assert indexes.redundant(found) == [], (
+        'Проверьте, что индекс *_like с varchar_pattern_ops не считается '
+        'лишним рядом с уникальным slug'
+    )
+
+def test_missing_indexes():
+    from reviews.indexes import IndexInfo, missing
+    from reviews.models import Comment, User
+
+    assert missing(User, {}) == ['role'], (
+        'Проверьте, что булевы и many-to-many поля list_filter не '
+        'требуют индекса'
+    )
+    assert missing(Comment, {
+        'feed': IndexInfo(('review_id', 'pub_date'), False, 'btree'),
+    }) == ['author_id']
+
+
+@pytest.mark.django_db
+def test_check_indexes_command():
+    out = io.StringIO()
+    call_command('check_indexes', '--fail', stdout=out)
+    assert 'kind=missing' not in out.getvalue()
+    assert 'kind=redundant' not in out.getvalue(), (
+        'Проверьте, что схема без лишних и недостающих индексов'
+    )
@@ -0,0 +1,112 @@
+import pytest
+from django.test import Client, override_settings
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+
+    def test_server_timing_header(self, client, catalog):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        timing = response['Server-Timing']
+        assert 'db;dur=' in timing and 'desc="4 queries"' in timing, (
+            'Проверьте, что Server-Timing содержит время и число SQL'
+        )
+        assert 'serialize;dur=' in timing and 'total;dur=' in timing
+
+    def test_records_are_tagged_with_route(self, client, catalog):
+        from api.metrics import get_store
+
+        review = catalog.reviews.first()
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{catalog.id}/reviews/{review.id}/')
+        client.get('/api/v1/missing/')
+        records = get_store().snapshot()[0]
+        assert [record.route for record in records] == [
+            'titles-list', 'review-detail', 'unmatched',
+        ]
+        titles = records[0]
+        assert titles.queries == 4 and titles.status == 200
+        assert 0 < titles.serialize < titles.total
+        assert titles.db + titles.serialize <= titles.total
+
+    def test_metrics_endpoint(self, client, admin_client, user, catalog,
+                              settings):
+        from rest_framework.test import APIClient
+
+        from api import cache
+
+        settings.API_CACHE_TIMEOUT = 300
+        cache.reset_counters()
+        client.get('/api/v1/titles/')
+        assert client.get('/api/v1/_metrics').status_code == 401
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+        assert user_client.get('/api/v1/_metrics').status_code == 403, (
+            'Проверьте, что метрики доступны только администратору'
+        )
+        response = admin_client.get('/api/v1/_metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert ('yamdb_http_requests_total{route="titles-list",'
+                'method="GET",status="200"} 1') in body
+        assert ('yamdb_http_request_queries{route="titles-list",'
+                'method="GET",quantile="0.99"} 4') in body
+        assert ('yamdb_http_request_queries_count{route="titles-list",'
+                'method="GET"} 1') in body
+        assert 'yamdb_api_cache_misses_total 1' in body
+
+    def test_workers_share_directory(self, client, admin_client, catalog,
+                                     settings, tmp_path):
+        import json
+        import os
+        import subprocess
+        import sys
+
+        from api import cache, metrics
+
+        settings.API_METRICS_DIR = str(tmp_path)
+        settings.API_METRICS_FLUSH_INTERVAL = 60
+        metrics.reset_store()
+        cache.reset_counters()
+        client.get('/api/v1/titles/')
+        # Снимок завершённого воркера: его счётчики остаются в сумме, а
+        # окно квантилей — нет.
+        exited = subprocess.Popen([sys.executable, '-c', ''])
+        exited.wait()
+        key = ['titles-list', 'GET']
+        (tmp_path / f'{exited.pid}.json').write_text(json.dumps({
+            'cache': {'hits': 2, 'misses': 1},
+            'requests': [key + [200, 2]],
+            'sums': [key + [{'count': 2, 'total': 1.0, 'db': 0.5,
+                             'queries': 200, 'serialize': 0.1}]],
+            'recent': [key + [0.5, 0.25, 100, 0.05]] * 2,
+        }))
+        body = admin_client.get('/api/v1/_metrics').content.decode()
+        assert ('yamdb_http_requests_total{route="titles-list",'
+                'method="GET",status="200"} 3') in body, (
+            'Проверьте, что /_metrics складывает счётчики всех воркеров'
+        )
+        assert ('yamdb_http_request_queries_count{route="titles-list",'
+                'method="GET"} 3') in body
+        assert ('yamdb_http_request_queries{route="titles-list",'
+                'method="GET",quantile="0.99"} 4') in body
+        assert 'Requests handled by all workers.' in body
+        assert 'yamdb_api_cache_hits_total 2' in body, (
+            'Проверьте, что счётчики кэша складываются по снимкам воркеров'
+        )
+        assert f'{os.getpid()}.json' in [
+            path.name for path in tmp_path.iterdir()
+        ]
+
+    def test_disabled(self, catalog):
+        from api.metrics import get_store
+
+        with override_settings(API_METRICS_ENABLED=False):
+            response = Client().get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что выключенные метрики не добавляют заголовок'
+        )
+        assert get_store().snapshot()[0] == []
@@ -0,0 +1,96 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_queues_email_instead_of_sending(self, client):
+        from reviews.confirmation import check_code
+        from reviews.models import OutgoingEmail, User
+
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'newbie', 'email': 'newbie@yamdb.fake',
+        })
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'newbie@yamdb.fake'
+        assert check_code(User.objects.get(), email.message)
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что send_emails отправляет письма из очереди'
+        )
+        assert mail.outbox[0].to == ['newbie@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не уходит повторно'
+        )
+
+    def test_failed_email_is_retried_with_backoff(self, monkeypatch):
+        from django.core.mail import EmailMessage
+        from reviews import outbox
+        from reviews.models import OutgoingEmail
+
+        email = outbox.enqueue('Subject', 'code', 'user@yamdb.fake')
+        original_send = EmailMessage.send
+
+        def broken_send(self, fail_silently=False):
+            raise ConnectionError('smtp is down')
+
+        monkeypatch.setattr(EmailMessage, 'send', broken_send)
+        assert outbox.send_batch() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 1 and email.sent_at is None
+        assert 'smtp is down' in email.last_error
+        assert email.next_attempt_at > email.created_at, (
+            'Проверьте, что неудачное письмо откладывается'
+        )
+        assert outbox.send_batch() == (0, 0), (
+            'Проверьте, что отложенное письмо не отправляется до срока'
+        )
+
+        monkeypatch.setattr(EmailMessage, 'send', original_send)
+        OutgoingEmail.objects.update(next_attempt_at=email.created_at)
+        assert outbox.send_batch() == (1, 0)
+        assert len(mail.outbox) == 1
+
+    def test_smtp_runs_outside_transaction(self, monkeypatch):
+        from django.core.mail import EmailMessage
+        from django.db import connection
+        from reviews import outbox
+
+        email = outbox.enqueue('Subject', 'code', 'user@yamdb.fake')
+        # Тест сам выполняется в транзакции pytest-django.
+        savepoints = len(connection.savepoint_ids)
+        original_send = EmailMessage.send
+        seen = []
+
+        def checked_send(self, fail_silently=False):
+            seen.append((len(connection.savepoint_ids),
+                         outbox.pending().exists()))
+            return original_send(self, fail_silently)
+
+        monkeypatch.setattr(EmailMessage, 'send', checked_send)
+        assert outbox.send_batch() == (1, 0)
+        assert seen == [(savepoints, False)], (
+            'Проверьте, что письмо забирается короткой транзакцией и '
+            'отправляется вне её'
+        )
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+
+    def test_retry_delay_grows_and_is_capped(self, settings):
+        from reviews.outbox import retry_delay
+
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 10
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY = 60
+        assert [retry_delay(n).total_seconds() for n in (1, 2, 3, 4)] == [
+            10, 20, 40, 60,
+        ]
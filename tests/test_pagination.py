@@ -0,0 +1,170 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestFeedPagination:
+
+    def test_offset_is_default(self, client, catalog):
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        data = client.get(url, {'limit': 2, 'offset': 2}).json()
+        assert data['count'] == 3 and len(data['results']) == 1, (
+            'Проверьте, что отзывы по умолчанию пагинируются limit/offset'
+        )
+
+    def test_cursor_walks_reviews(self, client, catalog,
+                                  django_assert_num_queries):
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        with django_assert_num_queries(2):
+            data = client.get(url, {'pagination': 'cursor', 'limit': 2}).json()
+        assert 'count' not in data, (
+            'Проверьте, что курсорная пагинация не считает COUNT(*)'
+        )
+        ids = [review['id'] for review in data['results']]
+        data = client.get(data['next']).json()
+        ids += [review['id'] for review in data['results']]
+        assert data['next'] is None
+        expected = list(
+            catalog.reviews.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            'Проверьте, что курсор обходит отзывы по (pub_date, id) без '
+            'пропусков и повторов'
+        )
+
+    def test_cursor_walks_comments(self, client, catalog):
+        review = catalog.reviews.first()
+        url = f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/'
+        data = client.get(url, {'pagination': 'cursor', 'limit': 1}).json()
+        ids = []
+        while True:
+            ids += [comment['id'] for comment in data['results']]
+            if data['next'] is None:
+                break
+            data = client.get(data['next']).json()
+        assert sorted(ids) == sorted(
+            review.comments_review.values_list('id', flat=True)
+        )
+
+    def test_cursor_seeks_pub_date_and_id(self, client, catalog, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review
+
+        pub_date = catalog.reviews.first().pub_date
+        catalog.reviews.update(pub_date=pub_date)
+        expected = list(catalog.reviews.order_by('-id').values_list(
+            'id', flat=True
+        ))
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        first = client.get(url, {'pagination': 'cursor', 'limit': 1}).json()
+        # Новый отзыв с той же pub_date не сдвигает следующие страницы.
+        Review.objects.filter(pk=Review.objects.create(
+            title=catalog, author=user, text='Новый', score=1
+        ).pk).update(pub_date=pub_date)
+        ids = [first['results'][0]['id']]
+        data = first
+        with CaptureQueriesContext(connection) as queries:
+            while data['next'] is not None:
+                data = client.get(data['next']).json()
+                ids += [review['id'] for review in data['results']]
+        assert ids == expected, (
+            'Проверьте, что курсор ищет по паре (pub_date, id)'
+        )
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        assert '"pub_date", "reviews_review"."id") <' in sql
+        assert 'OFFSET' not in sql
+        previous = client.get(data['previous']).json()
+        assert [review['id'] for review in previous['results']] == ids[1:2]
+
+
+@pytest.mark.django_db
+class TestProjectPagination:
+
+    def test_limit_is_capped(self, client):
+        from reviews.models import Genre
+
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(105)
+        )
+        data = client.get('/api/v1/genres/', {'limit': 1000000}).json()
+        assert data['count'] == 105
+        assert len(data['results']) == 100, (
+            'Проверьте, что ?limit ограничен max_limit'
+        )
+        assert 'limit=100' in data['next']
+
+    def test_count_can_be_omitted(self, client, catalog,
+                                  django_assert_num_queries):
+        with django_assert_num_queries(3):
+            data = client.get(
+                '/api/v1/titles/', {'limit': 2, 'count': 'none'}
+            ).json()
+        assert 'count' not in data, (
+            'Проверьте, что ?count=none не выполняет COUNT(*)'
+        )
+        assert len(data['results']) == 2 and data['next'] is not None
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 1 and data['next'] is None
+
+    def test_estimate_is_exact_for_small_sets(self, client, catalog):
+        data = client.get('/api/v1/titles/', {'count': 'estimate'}).json()
+        assert data['count'] == 3 and 'count_estimated' not in data
+
+
+@pytest.mark.django_db
+class TestStreamingList:
+
+    def test_titles_stream_matches_regular_list(self, admin_client, catalog,
+                                                settings):
+        import json
+
+        client = admin_client
+        settings.API_STREAM_CHUNK_SIZE = 2
+        response = client.get('/api/v1/titles/', {'stream': 'true'})
+        assert response.streaming, (
+            'Проверьте, что ?stream=true отдаёт StreamingHttpResponse'
+        )
+        streamed = json.loads(b''.join(response.streaming_content))
+        regular = client.get('/api/v1/titles/').json()['results']
+        assert sorted(streamed, key=lambda title: title['id']) == sorted(
+            regular, key=lambda title: title['id']
+        )
+        again = client.get('/api/v1/titles/', {'stream': 'true'},
+                           HTTP_IF_NONE_MATCH=response['ETag'])
+        assert again.status_code == 304
+
+    def test_stream_prefetches_per_chunk(
+            self, admin_client, catalog, settings, django_assert_num_queries):
+        import json
+
+        client = admin_client
+        settings.API_STREAM_CHUNK_SIZE = 2
+        response = client.get('/api/v1/titles/', {'stream': '1'})
+        # Выборка и жанры для каждой из двух пачек.
+        with django_assert_num_queries(3):
+            body = b''.join(response.streaming_content)
+        assert len(json.loads(body)) == 3
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        response = client.get(url, {'stream': '1'})
+        with django_assert_num_queries(1):
+            body = b''.join(response.streaming_content)
+        assert len(json.loads(body)) == 3
+
+    def test_stream_only_for_admin(self, client, user, catalog):
+        from rest_framework.test import APIClient
+
+        user_client = APIClient()
+        user_client.force_authenticate(user=user)
+        urls = ('/api/v1/titles/', f'/api/v1/titles/{catalog.id}/reviews/')
+        for url in urls:
+            etag = client.get(url)['ETag']
+            response = client.get(url, {'stream': 'true'},
+                                  HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 401, (
+                'Проверьте, что аноним не выгружает список целиком'
+            )
+            response = user_client.get(url, {'stream': 'true'})
+            assert response.status_code == 403, (
+                'Проверьте, что выгрузка целиком доступна только админу'
+            )
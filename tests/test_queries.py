@@ -0,0 +1,159 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReadQueries:
+    """Число запросов к БД не должно зависеть от размера страницы.
+
+    Списки делают один дополнительный запрос — версию данных для ETag.
+    """
+
+    @pytest.mark.parametrize('url, queries', [
+        ('/api/v1/titles/', 4),
+        ('/api/v1/genres/', 3),
+        ('/api/v1/categories/', 3),
+    ])
+    def test_catalog_lists(self, client, catalog, django_assert_num_queries,
+                           url, queries):
+        with django_assert_num_queries(queries):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['count'] == 3
+
+    def test_title_detail(self, client, catalog, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{catalog.id}/')
+        assert response.status_code == 200
+
+    def test_reviews(self, client, catalog, django_assert_num_queries):
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.json()['count'] == 3
+        review_id = response.json()['results'][0]['id']
+        # Объект ищется вместе с родителем из URL, без отдельной загрузки.
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{review_id}/')
+        assert response.status_code == 200
+
+    def test_comments(self, client, catalog, django_assert_num_queries):
+        review = catalog.reviews.first()
+        url = f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.json()['count'] == 3
+        comment_id = response.json()['results'][0]['id']
+        # Объект ищется вместе с родителем из URL, без отдельной загрузки.
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{comment_id}/')
+        assert response.status_code == 200
+
+    def test_users(self, admin_client, catalog, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/users/')
+        assert response.json()['count'] == 4
+        with django_assert_num_queries(1):
+            response = admin_client.get('/api/v1/users/author0/')
+        assert response.status_code == 200
+        # Профиль читается во вьюхе: пользователь запроса собран из claims.
+        with django_assert_num_queries(1):
+            response = admin_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+
+
+
+@pytest.mark.django_db
+class TestWriteQueries:
+    """Родитель из URL загружается один раз за запрос."""
+
+    def test_review_create(self, catalog, user, django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f'/api/v1/titles/{catalog.id}/reviews/'
+        # Произведение, INSERT отзыва, гистограмма и версия ленты отзывов
+        # одним UPDATE; ещё два запроса — SAVEPOINT и RELEASE вокруг записи.
+        with django_assert_num_queries(5):
+            response = client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        # Дубль ловит ограничение unique_review, а не проверка до INSERT;
+        # exists() выполняется только после IntegrityError.
+        with django_assert_num_queries(6):
+            response = client.post(url, {'text': 'Ещё', 'score': 3})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение отклоняется'
+        )
+        assert catalog.reviews.filter(author=user).count() == 1
+
+    def test_review_update(self, catalog, django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        review = catalog.reviews.first()
+        client = APIClient()
+        client.force_authenticate(user=review.author)
+        url = f'/api/v1/titles/{catalog.id}/reviews/{review.id}/'
+        # Отзыв, его UPDATE и один UPDATE гистограммы с версией ленты.
+        with django_assert_num_queries(3):
+            response = client.patch(url, {'score': 1})
+        assert response.status_code == 200
+        assert response.json()['score'] == 1
+
+    def test_comment_create(self, catalog, user, django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        review = catalog.reviews.first()
+        url = f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/'
+        # Отзыв, INSERT комментария и сдвиг версии ленты у отзыва.
+        with django_assert_num_queries(3):
+            response = client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 201
+
+    def test_review_of_another_title(self, client, catalog, user):
+        from reviews.models import Title
+        from rest_framework.test import APIClient
+
+        other = Title.objects.exclude(pk=catalog.pk).first()
+        review = catalog.reviews.first()
+        comment = review.comments_review.first()
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что отзыв ищется в пределах произведения из URL'
+        )
+        assert client.get(f'{url}{comment.id}/').status_code == 404
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        response = api_client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [
+    '/api/v1/titles/', '/api/v1/titles/?genre=genre-1&year=2001',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/?pagination=cursor&limit=2',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+    '/api/v1/titles/{title}/reviews/?stream=1',
+])
+def test_read_serializers_match_full(admin_client, catalog, monkeypatch,
+                                     url):
+    from api import views
+    from django.core.cache import cache
+    from reviews.models import Title
+
+    Title.objects.create(name='Без категории', year=1999)
+    review = catalog.reviews.first()
+    url = url.format(title=catalog.id, review=review.id)
+    client = admin_client
+    fast = client.get(url)
+    for viewset in (views.TitleViewSet, views.ReviewViewSet,
+                    views.CommentViewSet):
+        monkeypatch.setattr(viewset, 'read_serializer_class', None)
+    cache.clear()
+    full = client.get(url)
+    assert fast.status_code == full.status_code == 200
+    assert b''.join(fast) == b''.join(full), (
+        'Проверьте, что облегчённый сериализатор отдаёт тот же JSON'
+    )
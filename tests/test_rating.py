@@ -0,0 +1,114 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+
+def rating_of(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_review_create_update_delete(self, title, user, another_user):
+        from reviews.models import Review
+
+        assert rating_of(title) == (0, 0, None), (
+            'Проверьте, что у произведения без отзывов рейтинг равен None'
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Плохо', score=5
+        )
+        assert rating_of(title) == (15, 2, 7), (
+            'Проверьте, что создание отзыва обновляет рейтинг произведения'
+        )
+
+        review.score = 3
+        review.save()
+        review.save()
+        assert rating_of(title) == (8, 2, 4), (
+            'Проверьте, что изменение оценки обновляет рейтинг произведения'
+        )
+
+        Review.objects.get(pk=review.pk).delete()
+        assert rating_of(title) == (5, 1, 5), (
+            'Проверьте, что удаление отзыва обновляет рейтинг произведения'
+        )
+
+    def test_bulk_and_cascade_delete(self, title, user, another_user):
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='1', score=2)
+        Review.objects.create(
+            title=title, author=another_user, text='2', score=9
+        )
+        another_user.delete()
+        assert rating_of(title) == (2, 1, 2), (
+            'Проверьте, что каскадное удаление отзывов обновляет рейтинг'
+        )
+        Review.objects.filter(title=title).delete()
+        assert rating_of(title) == (0, 0, None), (
+            'Проверьте, что массовое удаление отзывов обновляет рейтинг'
+        )
+
+    def test_score_out_of_range(self, title, user):
+        from django.db import IntegrityError, transaction
+        from reviews.models import Review
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Review.objects.create(title=title, author=user, text='1',
+                                  score=11)
+        assert not Review.objects.exists(), (
+            'Проверьте, что отзыв с оценкой вне 1..10 не записывается'
+        )
+        assert rating_of(title) == (0, 0, None), (
+            'Проверьте, что оценка вне 1..10 не попадает в гистограмму'
+        )
+
+    def test_rebuild_ratings(self, title, user):
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='1', score=6)
+        Review.objects.update(score=8)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        assert rating_of(title) == (8, 1, 8), (
+            'Проверьте, что rebuild_ratings пересчитывает счётчики рейтинга'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    def test_titles_list_rating(self, client, title, user):
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='1', score=7)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 7, (
+            'Проверьте, что рейтинг в списке произведений берётся из счётчиков'
+        )
+
+    def test_title_stats(self, client, title, user, another_user,
+                         django_assert_num_queries):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.id}/stats/'
+        data = client.get(url).json()
+        assert data['count'] == 0 and data['median'] is None
+        Review.objects.create(title=title, author=user, text='1', score=3)
+        Review.objects.create(
+            title=title, author=another_user, text='2', score=8
+        )
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 2
+        assert data['mean'] == 5.5
+        assert data['median'] == 5.5
+        assert data['histogram'] == {
+            str(score): int(score in (3, 8)) for score in range(1, 11)
+        }, 'Проверьте, что гистограмма оценок отдаётся по всем 10 баллам'
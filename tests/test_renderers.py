@@ -0,0 +1,109 @@
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+PAYLOADS = [
+    {'pub_date': datetime.datetime(2022, 8, 27, 6, 8, 1, 123456,
+                                   tzinfo=timezone.utc)},
+    {'naive': datetime.datetime(2022, 8, 27, 6, 8),
+     'date': datetime.date(2022, 8, 27),
+     'time': datetime.time(6, 8, 1, 500)},
+    {'offset': datetime.datetime(
+        2022, 8, 27, 6, 8,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=3)))},
+    {'decimal': Decimal('7.25'), 'float': 7.25, 'int': 10, 'bool': True,
+     'none': None},
+    {'lazy': gettext_lazy('Отзыв'), 'uuid': uuid.UUID(int=1),
+     'delta': datetime.timedelta(hours=1, microseconds=5)},
+    OrderedDict([('text', 'Кириллица, emoji 😀, "кавычки" и \\ слэш'),
+                 ('control', '\n\t\x00\x1f\x7f'),
+                 ('separators', 'a b c')]),
+    [{'nested': [1, [2, [3]], {'deep': ()}]}, 'tuple', (1, 2)],
+    {'big': 2 ** 70, 'negative': -2 ** 63},
+    {1: 'int key', None: 'none key'},
+    [],
+    {},
+]
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def fast_renderer(request, monkeypatch):
+    from api import renderers
+
+    if not request.param:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    elif renderers.orjson is None:
+        pytest.skip('orjson не установлен')
+    return renderers.FastJSONRenderer()
+
+
+class TestFastJSONRenderer:
+
+    @pytest.mark.parametrize('payload', PAYLOADS)
+    def test_output_matches_drf_renderer(self, fast_renderer, payload):
+        from rest_framework.renderers import JSONRenderer
+
+        assert fast_renderer.render(payload) == JSONRenderer().render(
+            payload
+        ), 'Проверьте, что вывод совпадает с JSONRenderer байт в байт'
+
+    def test_indent_and_empty_data(self, fast_renderer):
+        from rest_framework.renderers import JSONRenderer
+
+        media_type = 'application/json; indent=4'
+        assert fast_renderer.render(PAYLOADS[0], media_type) == (
+            JSONRenderer().render(PAYLOADS[0], media_type)
+        )
+        assert fast_renderer.render(None) == b''
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/', '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+        '/api/v1/titles/{title}/stats/',
+    ])
+    def test_api_responses_match(self, client, catalog, fast_renderer,
+                                 url):
+        from rest_framework.renderers import JSONRenderer
+
+        review = catalog.reviews.first()
+        response = client.get(url.format(title=catalog.id, review=review.id))
+        assert response.status_code == 200
+        assert fast_renderer.render(response.data) == (
+            JSONRenderer().render(response.data)
+        )
+        assert response.content == JSONRenderer().render(response.data)
+
+
+class TestFastJSONParser:
+
+    @pytest.mark.parametrize('orjson_installed', [True, False])
+    def test_parses_like_drf_parser(self, monkeypatch, orjson_installed):
+        from api import parsers
+        from rest_framework.exceptions import ParseError
+        from rest_framework.parsers import JSONParser
+
+        if not orjson_installed:
+            monkeypatch.setattr(parsers, 'orjson', None)
+        body = '{"text": "Отзыв 😀", "score": 7, "list": [1.5, null]}'
+        assert parsers.FastJSONParser().parse(
+            io.BytesIO(body.encode())
+        ) == JSONParser().parse(io.BytesIO(body.encode()))
+        for invalid in (b'{"score": NaN}', b'{"score": 1,}', b'\xff'):
+            with pytest.raises(ParseError):
+                parsers.FastJSONParser().parse(io.BytesIO(invalid))
+
+    @pytest.mark.django_db
+    def test_api_accepts_json_body(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/', '{"name": "Драма", "slug": "drama"}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        assert response.json()['slug'] == 'drama'
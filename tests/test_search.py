@@ -0,0 +1,77 @@
+import pytest
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Title
+
+    return [
+        Title.objects.create(name='Война и мир', year=1869,
+                             description='Роман о войне 1812 года'),
+        Title.objects.create(name='Мир Дикого Запада', year=2016,
+                             description='Сериал'),
+        Title.objects.create(name='Тихий Дон', year=1940,
+                             description='Мир и война на Дону'),
+    ]
+
+
+def search(client, text):
+    response = client.get('/api/v1/titles/', {'search': text})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture(autouse=True)
+    def search_fallback(self, settings):
+        # Тесты идут на SQLite в одном процессе — запасной индекс уместен.
+        settings.SEARCH_FALLBACK_ENABLED = True
+
+    def test_ranked_by_name_over_description(self, client, titles):
+        assert search(client, 'мир') == [
+            'Война и мир', 'Мир Дикого Запада', 'Тихий Дон'
+        ], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании'
+        )
+
+    def test_all_words_must_match(self, client, titles):
+        assert search(client, 'война Дон') == ['Тихий Дон']
+        assert search(client, 'война космос') == []
+
+    def test_index_follows_writes(self, client, titles):
+        assert search(client, 'Запада') == ['Мир Дикого Запада']
+        titles[1].name = 'Мир Дикого Востока'
+        titles[1].save()
+        assert search(client, 'Запада') == []
+        assert search(client, 'Востока') == ['Мир Дикого Востока']
+        titles[0].delete()
+        assert 'Война и мир' not in search(client, 'мир'), (
+            'Проверьте, что удалённые произведения не находятся поиском'
+        )
+
+    def test_too_many_matches_rejected(self, client, titles, monkeypatch):
+        from reviews import search as search_module
+
+        monkeypatch.setattr(search_module, 'FALLBACK_LIMIT', 2)
+        response = client.get('/api/v1/titles/', {'search': 'мир'})
+        assert response.status_code == 400, (
+            'Проверьте, что запасной индекс не обрезает совпадения молча'
+        )
+        assert search(client, 'Дон') == ['Тихий Дон']
+
+
+@pytest.mark.django_db
+def test_fallback_disabled_outside_postgresql(client, titles, settings):
+    from django.db import connection
+
+    if connection.vendor == 'postgresql':
+        pytest.skip('Запасной индекс не используется на PostgreSQL')
+    settings.SEARCH_FALLBACK_ENABLED = False
+    response = client.get('/api/v1/titles/', {'search': 'мир'})
+    assert response.status_code == 400, (
+        'Проверьте, что без SEARCH_FALLBACK_ENABLED поиск вне PostgreSQL '
+        'отклоняется, а не отдаёт индекс одного процесса'
+    )
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import runpy
+
+from .conftest import root_dir
+
+GUNICORN_CONF = os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+
+
+class TestServing:
+
+    def test_gunicorn_config(self, monkeypatch):
+        for name in ('GUNICORN_WORKERS', 'GUNICORN_THREADS'):
+            monkeypatch.delenv(name, raising=False)
+        config = runpy.run_path(GUNICORN_CONF)
+        assert config['workers'] == config['cpu_count']() * 2 + 1, (
+            'Проверьте, что число воркеров считается от числа CPU'
+        )
+        assert config['worker_class'] == 'gthread'
+        monkeypatch.setenv('GUNICORN_WORKERS', '3')
+        monkeypatch.setenv('GUNICORN_THREADS', '8')
+        config = runpy.run_path(GUNICORN_CONF)
+        assert (config['workers'], config['threads']) == (3, 8)
+
+    def test_gunicorn_metrics_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('API_METRICS_DIR', str(tmp_path))
+        (tmp_path / '7.json').write_text('{}')
+        config = runpy.run_path(GUNICORN_CONF)
+        assert config['raw_env'] == [f'API_METRICS_DIR={tmp_path}'], (
+            'Проверьте, что воркеры получают общий каталог метрик'
+        )
+        config['on_starting'](None)
+        assert list(tmp_path.iterdir()) == [], (
+            'Проверьте, что снимки прошлого запуска удаляются'
+        )
+
+    def test_persistent_connections(self):
+        from django.conf import settings
+
+        database = settings.DATABASES['default']
+        assert database['CONN_MAX_AGE'] > 0, (
+            'Проверьте, что соединения с БД переиспользуются'
+        )
+        assert database['CONN_HEALTH_CHECKS']
+
+    def test_unusable_connection_closed(self, monkeypatch):
+        from api import signals
+
+        class Connection:
+            in_atomic_block = False
+            settings_dict = {'CONN_HEALTH_CHECKS': True,
+                             'CONN_HEALTH_CHECK_INTERVAL': 30}
+            closed = False
+
+            def __init__(self, usable):
+                self.connection = object()
+                self.usable = usable
+                self.checks = 0
+
+            def is_usable(self):
+                self.checks += 1
+                return self.usable
+
+            def close(self):
+                self.closed = True
+
+        broken, alive = Connection(False), Connection(True)
+        monkeypatch.setattr(signals.connections, 'all',
+                            lambda: [broken, alive])
+        now = [1000.0]
+        monkeypatch.setattr(signals.time, 'monotonic', lambda: now[0])
+        signals.check_connections()
+        now[0] += 10
+        signals.check_connections()
+        assert broken.checks == alive.checks == 0, (
+            'Проверьте, что соединение проверяется не на каждом запросе'
+        )
+        now[0] += 30
+        signals.check_connections()
+        assert broken.closed and not alive.closed, (
+            'Проверьте, что оборванное соединение закрывается до запроса'
+        )
+        assert alive.checks == 1
+
+    def test_asgi_application(self):
+        from api_yamdb.asgi import application
+
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'',
+                    'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(application({
+            'type': 'http', 'method': 'GET', 'path': '/api/v1/missing/',
+            'query_string': b'', 'headers': [], 'http_version': '1.1',
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+            'scheme': 'http', 'root_path': '',
+        }, receive, send))
+        assert messages[0]['type'] == 'http.response.start'
+        assert messages[0]['status'] == 404
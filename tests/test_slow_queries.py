@@ -0,0 +1,139 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+
+def test_normalize():
+    from api.slow_queries import normalize
+
+    assert normalize(
+        'SELECT "reviews_title"."score_10" FROM "reviews_title"\n'
+        "WHERE (\"name\" LIKE '%Ночь%' AND \"id\" IN (%s, %s, %s)) "
+        'LIMIT 21 OFFSET 40'
+    ) == (
+        'SELECT "reviews_title"."score_10" FROM "reviews_title" '
+        'WHERE ("name" LIKE ? AND "id" IN (...)) LIMIT ? OFFSET ?'
+    ), 'Проверьте, что литералы и списки IN заменяются на ?'
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+
+    def test_captures_view_and_plan(self, client, catalog, tmp_path):
+        log = tmp_path / 'slow.log'
+        with override_settings(API_SLOW_QUERY_MS=1e-6,
+                               API_SLOW_QUERY_SAMPLE_RATE=1,
+                               API_SLOW_QUERY_LOG=str(log)):
+            response = client.get(f'/api/v1/titles/{catalog.id}/reviews/')
+        assert response.status_code == 200
+        assert 'desc="3 queries"' in response['Server-Timing'], (
+            'Проверьте, что EXPLAIN не попадает в метрики запроса'
+        )
+        entries = [json.loads(line) for line in log.read_text().splitlines()]
+        assert len(entries) == 3
+        assert {entry['view'] for entry in entries} == {'ReviewViewSet'}
+        assert all(entry['plan'] for entry in entries), (
+            'Проверьте, что к медленному SELECT прилагается план'
+        )
+        assert all(entry['sql'].startswith('SELECT') for entry in entries)
+
+    def test_write_logged_without_params(self, user, catalog, tmp_path):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        log = tmp_path / 'slow.log'
+        with override_settings(API_SLOW_QUERY_MS=1e-6,
+                               API_SLOW_QUERY_SAMPLE_RATE=1,
+                               API_SLOW_QUERY_LOG=str(log)):
+            response = client.patch('/api/v1/users/me/',
+                                    {'email': 'secret@yamdb.fake'})
+        assert response.status_code == 200
+        entries = [json.loads(line) for line in log.read_text().splitlines()]
+        writes = [entry for entry in entries
+                  if entry['shape'].startswith('UPDATE')]
+        assert writes and all(
+            entry['sql'] is None and entry['params'] is None
+            for entry in writes
+        ), 'Проверьте, что у записи в журнале только форма запроса'
+        assert user.password not in log.read_text(), (
+            'Проверьте, что параметры записи не попадают в журнал'
+        )
+
+    def test_request_plan_does_not_run_query(self, monkeypatch):
+        from api.slow_queries import explain
+        from django.db import connection
+
+        executed = []
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def execute(self, sql, params=None):
+                # SAVEPOINT вокруг EXPLAIN идут через тот же курсор.
+                if sql.startswith('EXPLAIN'):
+                    executed.append(sql)
+
+            def fetchall(self):
+                return [('Seq Scan on reviews_title',)]
+
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        monkeypatch.setattr(connection, 'cursor', Cursor)
+        sql = 'SELECT * FROM reviews_title'
+        assert explain(connection, sql, ()) == 'Seq Scan on reviews_title'
+        explain(connection, sql, (), analyze=True)
+        assert executed == [f'EXPLAIN {sql}',
+                            f'EXPLAIN (ANALYZE, BUFFERS) {sql}'], (
+            'Проверьте, что в запросе план снимается без ANALYZE'
+        )
+
+    def test_serializer_field_attribution(self, catalog):
+        import sys
+
+        from api.serializers import CommentSerializer
+        from api.slow_queries import serializer_field
+        from django.db import connection
+        from reviews.models import Comment
+
+        fields = []
+
+        def wrapper(execute, sql, params, many, context):
+            fields.append(serializer_field(sys._getframe(1)))
+            return execute(sql, params, many, context)
+
+        comment = Comment.objects.first()
+        with connection.execute_wrapper(wrapper):
+            CommentSerializer(comment).data
+        assert fields == ['CommentSerializer.author'], (
+            'Проверьте, что запрос приписывается полю сериализатора'
+        )
+
+    def test_command_groups_shapes(self, tmp_path, capsys):
+        log = tmp_path / 'slow.log'
+        entries = [
+            {'view': 'TitleViewSet', 'field': None, 'duration_ms': 30,
+             'shape': 'SELECT ? FROM t', 'plan': 'SCAN t'},
+            {'view': 'TitleViewSet', 'field': 'TitleSerializer.genre',
+             'duration_ms': 50, 'shape': 'SELECT ? FROM t', 'plan': None},
+            {'view': 'ReviewViewSet', 'field': None, 'duration_ms': 70,
+             'shape': 'SELECT ? FROM r', 'plan': None},
+        ]
+        log.write_text(''.join(json.dumps(entry) + '\n'
+                               for entry in entries) + '{"broken')
+        call_command('slow_queries', '--top', '1', '--log', str(log),
+                     '--clear')
+        output = capsys.readouterr().out.splitlines()
+        assert output[0] == (
+            'count=2 total_ms=80.0 max_ms=50.0 views=TitleViewSet '
+            'fields=TitleSerializer.genre'
+        ), 'Проверьте, что формы группируются и сортируются по времени'
+        assert output[1:] == ['  SELECT ? FROM t', '    SCAN t']
+        assert log.read_text() == ''
+        with pytest.raises(CommandError, match='PostgreSQL'):
+            call_command('slow_queries', '--log', str(log), '--analyze')
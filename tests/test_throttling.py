@@ -0,0 +1,75 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_auth_scope_is_limited_per_ip(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                'auth': '2/min',
+            },
+        }
+        data = {'username': 'nobody', 'confirmation_code': 'x'}
+        first = client.post('/api/v1/auth/token/', data)
+        assert first['X-RateLimit-Limit'] == '2'
+        assert first['X-RateLimit-Remaining'] == '1'
+        client.post('/api/v1/auth/token/', data)
+        response = client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 429, (
+            'Проверьте, что auth/token ограничен по частоте'
+        )
+        assert response['Retry-After'] == '30'
+        assert response['X-RateLimit-Remaining'] == '0'
+        other_ip = client.post('/api/v1/auth/token/', data,
+                               REMOTE_ADDR='10.0.0.2')
+        assert other_ip.status_code == 404, (
+            'Проверьте, что ведро у каждого IP своё'
+        )
+        assert client.get('/api/v1/titles/').status_code == 200, (
+            'Проверьте, что у каталога отдельная квота'
+        )
+
+    def test_spoofed_forwarded_for_is_ignored(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                'auth': '2/min',
+            },
+        }
+        data = {'username': 'nobody', 'confirmation_code': 'x'}
+        statuses = [
+            # nginx дописывает адрес клиента после присланного им заголовка.
+            client.post('/api/v1/auth/token/', data,
+                        HTTP_X_FORWARDED_FOR=f'10.0.0.{number}, 192.0.2.1')
+            .status_code for number in range(3)
+        ]
+        assert statuses == [404, 404, 429], (
+            'Проверьте, что подменённое начало X-Forwarded-For не обходит '
+            'ограничение'
+        )
+
+    def test_local_store_refills_and_is_bounded(self):
+        from api.throttling import LocalBucketStore
+
+        store = LocalBucketStore(max_keys=2)
+        assert store.take('a', 2, 1.0, 0.0) == (True, 1)
+        assert store.take('a', 2, 1.0, 0.0) == (True, 0)
+        assert store.take('a', 2, 1.0, 0.5) == (False, 0.5)
+        assert store.take('a', 2, 1.0, 1.0) == (True, 0)
+        store.take('b', 2, 1.0, 1.0)
+        store.take('c', 2, 1.0, 1.0)
+        assert list(store.buckets) == ['b', 'c'], (
+            'Проверьте, что хранилище вытесняет давно не использованные ключи'
+        )
+
+    def test_cache_store_is_shared(self):
+        from api.throttling import CacheBucketStore
+
+        first = CacheBucketStore('default')
+        second = CacheBucketStore('default')
+        assert first.take('k', 1, 1 / 60, 100.0) == (True, 0)
+        assert second.take('k', 1, 1 / 60, 101.0)[0] is False
@@ -0,0 +1,66 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestUserUpdate:
+
+    def test_patch_saves_unique_fields(self, user, another_user,
+                                       django_assert_max_num_queries):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        data = {'email': 'renamed@yamdb.fake', 'username': 'Renamed'}
+        # Профиль, одна проверка уникальности, UPDATE (+ savepoint), сдвиг
+        # updated_at отзывов и комментариев переименованного автора и версий
+        # лент, где они лежат.
+        with django_assert_max_num_queries(9):
+            response = client.patch('/api/v1/users/me/', data)
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert (user.email, user.username) == (
+            'renamed@yamdb.fake', 'Renamed'
+        ), 'Проверьте, что валидация возвращает email и username'
+
+    def test_taken_values_are_reported_together(
+            self, admin_client, user, another_user,
+            django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = admin_client.patch(
+                f'/api/v1/users/{user.username}/',
+                {'email': another_user.email,
+                 'username': another_user.username},
+            )
+        assert response.status_code == 400
+        assert set(response.json()) == {'email', 'username'}, (
+            'Проверьте, что занятые email и username проверяются одним '
+            'запросом и оба попадают в ошибку'
+        )
+
+    def test_unchanged_values_are_not_checked(self, admin_client, user,
+                                              django_assert_num_queries):
+        # Пользователь, UPDATE и savepoint — без проверки уникальности.
+        with django_assert_num_queries(4):
+            response = admin_client.patch(
+            f'/api/v1/users/{user.username}/',
+                {'email': user.email, 'username': user.username,
+                 'bio': 'Био'},
+            )
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'Био'
+
+    def test_race_maps_integrity_error(self, user, another_user,
+                                       monkeypatch):
+        from api.serializers import UserSerializer
+        from rest_framework.exceptions import ValidationError
+
+        serializer = UserSerializer(
+            user, data={'email': another_user.email}, partial=True,
+        )
+        monkeypatch.setattr(UserSerializer, 'validate',
+                            lambda self, data: data)
+        assert serializer.is_valid()
+        monkeypatch.undo()
+        with pytest.raises(ValidationError) as error:
+            serializer.save()
+        assert 'email' in error.value.detail